@@ -0,0 +1,157 @@
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bundle import BUNDLE_PATH, is_bundle, load_bundle, read_info
+from forecasting import NUM_DAYS, batch_forecast
+from train import DEFAULT_CONFIG, compute_metrics
+
+# Horizonte avaliado, em pregões (equivalente aos dias úteis de MAX_FORECAST_DAYS)
+HORIZON = 10
+
+# Limite de cortes previstos juntos em um lote (memória das janelas de cada processo)
+MAX_CHUNK_SIZE = 256
+
+# Estado de cada processo do pool: modelo e scaler carregados uma única vez
+_worker = {}
+
+
+# Função para carregar o modelo e o scaler em cada processo do pool
+def _init_worker(backend, model_path, csv_path, threads):
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    if backend != 'numpy':
+        import tensorflow as tf
+
+        # Uma thread por processo: o paralelismo vem do pool
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+    close = pd.read_csv(csv_path)['Close'].to_numpy(dtype=np.float64)
+
+    if is_bundle(model_path):
+        # Mesmo modelo e scaler da aplicação, lidos do pacote
+        model, info = load_bundle(model_path, backend)
+        scaler = info.scaler
+    else:
+        from sklearn.preprocessing import MinMaxScaler
+
+        if backend == 'numpy':
+            from numpy_lstm import NumpyLSTM
+
+            model = NumpyLSTM.load(model_path)
+        else:
+            from tensorflow.keras.models import load_model
+
+            model = load_model(model_path)
+        # Modelo sem pacote: scaler ajustado sobre todo o CSV
+        scaler = MinMaxScaler(feature_range=(0, 1)).fit(close.reshape(-1, 1))
+    _worker.update(model=model, scaler=scaler, close=close)
+
+
+# Função executada no pool: previsão recursiva para um bloco de datas de corte, em um único lote
+def _forecast_chunk(cutoffs, num_days, horizon):
+    close = _worker['close']
+    windows = np.stack([close[cutoff - num_days:cutoff] for cutoff in cutoffs])
+    predictions = batch_forecast(_worker['model'], _worker['scaler'], windows, horizon)[:, 0, :]
+    actuals = np.stack([close[cutoff:cutoff + horizon] for cutoff in cutoffs])
+    return predictions, actuals
+
+
+# Função para obter o primeiro índice fora do último treino do modelo: o fim da janela do ajuste
+# incremental, se houver, ou a fronteira treino/teste do train.py. Cortes anteriores a ele avaliam
+# o modelo sobre dados vistos no treino
+def test_start(n_rows, model_path=BUNDLE_PATH, train_fraction=DEFAULT_CONFIG['train_fraction']):
+    if is_bundle(model_path):
+        metadata = read_info(model_path).metadata
+        if 'finetune' in metadata:
+            return metadata['finetune']['training_data']['end_row']
+        train_fraction = metadata.get('config', {}).get('train_fraction', train_fraction)
+        n_rows = metadata.get('training_data', {}).get('rows', n_rows)
+    return int(n_rows * train_fraction)
+
+
+# Função para escolher as datas de corte (índice da primeira linha prevista)
+def select_cutoffs(n_rows, num_days=NUM_DAYS, horizon=HORIZON, step=1, start=None):
+    first = max(num_days, start or num_days)
+    return np.arange(first, n_rows - horizon + 1, step)
+
+
+# Função para calcular as métricas por dia do horizonte
+def horizon_metrics(predictions, actuals):
+    rows = []
+    for day in range(predictions.shape[1]):
+        metrics = compute_metrics(actuals[:, day], predictions[:, day])
+        rows.append({'horizonte': day + 1, **metrics, 'amostras': len(actuals)})
+    return pd.DataFrame(rows)
+
+
+# Função para rodar o backtest walk-forward, distribuindo as datas de corte entre processos
+def backtest(csv_path='dados_petroleo.csv', backend='numpy', model_path=BUNDLE_PATH, num_days=None,
+             horizon=HORIZON, step=1, start=None, workers=None, chunk_size=None):
+    # Sem 'num_days', a janela do treino gravada no pacote (ou a padrão da aplicação)
+    if num_days is None:
+        num_days = read_info(model_path).window if is_bundle(model_path) else NUM_DAYS
+
+    df = pd.read_csv(csv_path, parse_dates=['Date'])
+    # Sem 'start', apenas cortes fora do treino
+    if start is None:
+        start = test_start(len(df), model_path)
+    cutoffs = select_cutoffs(len(df), num_days, horizon, step, start)
+    if len(cutoffs) == 0:
+        raise ValueError(f'Nenhuma data de corte: {len(df)} linhas, início {start}, janela {num_days} '
+                         f'e horizonte {horizon}')
+    workers = workers or os.cpu_count()
+    # Sem 'chunk_size', os cortes são divididos igualmente entre os processos, até MAX_CHUNK_SIZE por lote
+    chunk_size = chunk_size or min(math.ceil(len(cutoffs) / workers), MAX_CHUNK_SIZE)
+    chunks = [cutoffs[i:i + chunk_size] for i in range(0, len(cutoffs), chunk_size)]
+
+    start_time = time.perf_counter()
+    # 'spawn' evita herdar o estado do TensorFlow do processo pai
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)) or 1, mp_context=context,
+                             initializer=_init_worker, initargs=(backend, model_path, csv_path, 1)) as pool:
+        results = list(pool.map(_forecast_chunk, chunks, [num_days] * len(chunks), [horizon] * len(chunks)))
+
+    predictions = np.concatenate([p for p, _ in results])
+    actuals = np.concatenate([a for _, a in results])
+
+    return {
+        'metrics': horizon_metrics(predictions, actuals),
+        'cutoff_dates': df['Date'].to_numpy()[cutoffs],
+        'predictions': predictions,
+        'actuals': actuals,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backtest walk-forward da previsão recursiva do LSTM.')
+    parser.add_argument('--data', default='dados_petroleo.csv')
+    parser.add_argument('--backend', choices=['numpy', 'keras'], default='numpy')
+    parser.add_argument('--model', default=BUNDLE_PATH,
+                        help='pacote do modelo, arquivo de pesos (.npz) ou modelo (.keras)')
+    parser.add_argument('--num-days', type=int, help='dias históricos usados como janela (padrão: a do pacote)')
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='pregões previstos a partir de cada corte')
+    parser.add_argument('--step', type=int, default=1, help='intervalo, em pregões, entre os cortes')
+    parser.add_argument('--start', type=int,
+                        help='índice da primeira data de corte (padrão: início do período de teste; '
+                             '0: todo o histórico)')
+    parser.add_argument('--workers', type=int, help='processos em paralelo (padrão: número de CPUs)')
+    parser.add_argument('--chunk-size', type=int,
+                        help='cortes previstos juntos em um lote (padrão: divididos entre os processos)')
+    parser.add_argument('--output', help='CSV com as métricas por dia do horizonte')
+    args = parser.parse_args()
+
+    result = backtest(args.data, args.backend, args.model, args.num_days, args.horizon, args.step,
+                      args.start, args.workers, args.chunk_size)
+    print(result['metrics'].to_string(index=False))
+    print(f"{len(result['cutoff_dates'])} cortes em {result['seconds']:.1f} s")
+    if args.output:
+        result['metrics'].to_csv(args.output, index=False)
@@ -0,0 +1,265 @@
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Diretório dos resultados salvos (baselines)
+BENCHMARK_DIR = 'benchmarks'
+
+# Benchmarks registrados: nome -> (função de preparação, repetições)
+BENCHMARKS = {}
+
+
+# Decorador para registrar um benchmark. A função recebe o contexto (dados) e retorna
+# o callable a ser medido; a preparação não entra no tempo medido.
+def benchmark(name, repeat=20):
+    def register(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return register
+
+
+# Série sintética determinística (passeio aleatório) com o mesmo formato de dados_petroleo.csv
+def synthetic_data(rows=7500, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 60 + np.cumsum(rng.normal(0, 1, rows))
+    close = close - min(close.min(), 0) + 10
+    dates = pd.bdate_range('1995-01-02', periods=rows)
+    return pd.DataFrame({'Date': dates, 'Close': close})
+
+
+# Dados reais do CSV, com a data convertida como na aplicação
+def real_data(path='dados_petroleo.csv'):
+    df_close = pd.read_csv(path)
+    df_close['Date'] = pd.to_datetime(df_close['Date'])
+    return df_close
+
+
+# Data final que resulta em exatamente 'business_days' dias úteis de previsão
+def end_date_for(df, business_days):
+    return pd.bdate_range(df['Date'].max() + timedelta(days=1), periods=business_days)[-1]
+
+
+# Versão original do notebook, usada como referência
+def notebook_create_dataset(dataset, time_step=1):
+    X, Y = [], []
+    for i in range(len(dataset) - time_step - 1):
+        a = dataset[i:(i + time_step), :]
+        X.append(a)
+        Y.append(dataset[i + time_step, 0])  # '0' é a coluna de fechamento
+    return np.array(X), np.array(Y)
+
+
+def _fitted_scaler(df):
+    from sklearn.preprocessing import MinMaxScaler
+
+    return MinMaxScaler(feature_range=(0, 1)).fit(df[['Close']])
+
+
+@benchmark('load_model', repeat=5)
+def bench_load_model(ctx):
+    from tensorflow.keras.models import load_model
+
+    return lambda: load_model('lstm_model.keras')
+
+
+@benchmark('load_numpy_model', repeat=20)
+def bench_load_numpy_model(ctx):
+    from numpy_lstm import NumpyLSTM
+
+    return lambda: NumpyLSTM.load('lstm_weights.npz')
+
+
+@benchmark('load_bundle', repeat=20)
+def bench_load_bundle(ctx):
+    from bundle import load_bundle
+
+    return lambda: load_bundle('lstm_bundle.npz', backend='numpy')
+
+
+@benchmark('read_csv', repeat=20)
+def bench_read_csv(ctx):
+    return lambda: real_data(ctx['csv'])
+
+
+for _source in ('real', 'synthetic'):
+    @benchmark(f'scaler_fit[{_source}]', repeat=50)
+    def bench_scaler_fit(ctx, _source=_source):
+        df = ctx[_source]
+        return lambda: _fitted_scaler(df)
+
+
+for _engine, _days in [(e, d) for e in ('keras', 'graph', 'numpy') for d in (1, 5, 15)]:
+    @benchmark(f'generate_predictions[{_engine}-{_days}d]', repeat=5 if _engine == 'keras' else 20)
+    def bench_generate_predictions(ctx, _engine=_engine, _days=_days):
+        from bundle import load_bundle
+        from forecasting import generate_predictions
+
+        df = ctx['real']
+        # Modelo, scaler e janela do pacote servido pela aplicação
+        model, info = load_bundle('lstm_bundle.npz', backend='numpy' if _engine == 'numpy' else 'keras')
+        scaler, window = info.scaler, info.window
+        engine = 'graph' if _engine == 'numpy' else _engine
+        end_date = end_date_for(df, _days)
+        # Aquecimento: compilação do grafo não entra na medição
+        generate_predictions(df, model, scaler, end_date, window, engine=engine)
+        return lambda: generate_predictions(df, model, scaler, end_date, window, engine=engine)
+
+
+for _source in ('real', 'synthetic'):
+    for _impl in ('notebook', 'vectorized'):
+        @benchmark(f'create_dataset[{_impl}-{_source}]', repeat=10)
+        def bench_create_dataset(ctx, _source=_source, _impl=_impl):
+            from dataset import create_dataset
+
+            scaled = _fitted_scaler(ctx[_source]).transform(ctx[_source][['Close']])
+            builder = notebook_create_dataset if _impl == 'notebook' else create_dataset
+            return lambda: builder(scaled, 20)
+
+
+for _source in ('real', 'synthetic'):
+    @benchmark(f'train_epoch[{_source}]', repeat=3)
+    def bench_train_epoch(ctx, _source=_source):
+        from dataset import make_tf_dataset
+        from train import DEFAULT_CONFIG, build_model, set_seed
+
+        set_seed(DEFAULT_CONFIG['seed'])
+        scaled = _fitted_scaler(ctx[_source]).transform(ctx[_source][['Close']])
+        train_ds = make_tf_dataset(scaled, DEFAULT_CONFIG['time_step'], DEFAULT_CONFIG['batch_size'])
+        model = build_model(DEFAULT_CONFIG['time_step'])
+        model.fit(train_ds, epochs=1, verbose=0)
+        return lambda: model.fit(train_ds, epochs=1, verbose=0)
+
+
+for _method in ('lttb', 'minmax'):
+    @benchmark(f'explorer_query[{_method}-synthetic]', repeat=50)
+    def bench_explorer_query(ctx, _method=_method):
+        from explorer import PriceExplorer
+
+        # Sem cache de consultas: mede a redução a partir dos níveis já montados
+        explorer = PriceExplorer(cache_size=0)
+        df = ctx['synthetic']
+        explorer.update(df, 'synthetic')
+        return lambda: explorer.query(df, 'synthetic', method=_method)
+
+
+# Pico de memória residente do processo, em MB
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# Função executada em um processo novo para cada benchmark, isolando memória e estado
+def _run_one(name, csv_path):
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    import warnings
+
+    warnings.filterwarnings('ignore')
+
+    setup, repeat = BENCHMARKS[name]
+    ctx = {'csv': csv_path, 'real': real_data(csv_path), 'synthetic': synthetic_data()}
+    fn = setup(ctx)
+
+    # Aquecimento fora da medição: importações sob demanda e caches da primeira chamada
+    fn()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    timings = np.array(timings)
+    return {
+        'repeat': repeat,
+        'mean_ms': float(timings.mean() * 1000),
+        'p50_ms': float(np.percentile(timings, 50) * 1000),
+        'p90_ms': float(np.percentile(timings, 90) * 1000),
+        'p99_ms': float(np.percentile(timings, 99) * 1000),
+        'throughput_per_s': float(1 / timings.mean()),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+# Função para rodar os benchmarks selecionados, cada um em um processo próprio
+def run(names, csv_path='dados_petroleo.csv'):
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for name in names:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(_run_one, (name, csv_path))
+        print(f"{name:45s} p50 {results[name]['p50_ms']:10.2f} ms  p99 {results[name]['p99_ms']:10.2f} ms"
+              f"  rss {results[name]['peak_rss_mb']:8.1f} MB")
+    return results
+
+
+# Informações do ambiente, gravadas junto com os resultados
+def environment():
+    versions = {}
+    for module in ('numpy', 'pandas', 'sklearn', 'tensorflow', 'keras'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(), 'versions': versions}
+
+
+# Função para comparar com um baseline; retorna os benchmarks que ficaram mais lentos que o limite
+def compare(results, baseline, threshold=0.2):
+    regressions = []
+    for name, result in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        ratio = result['p50_ms'] / reference['p50_ms']
+        flag = 'REGRESSÃO' if ratio > 1 + threshold else ''
+        print(f'{name:45s} {reference["p50_ms"]:10.2f} -> {result["p50_ms"]:10.2f} ms  ({ratio:5.2f}x) {flag}')
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == '__main__':
+    import argparse
+    import fnmatch
+
+    parser = argparse.ArgumentParser(description='Benchmarks de carregamento, inferência, janelamento e treino.')
+    parser.add_argument('patterns', nargs='*', default=['*'], help='filtros dos nomes (glob), ex.: "generate_*"')
+    parser.add_argument('--data', default='dados_petroleo.csv', help='CSV real usado nos benchmarks')
+    parser.add_argument('--save', help='nome do arquivo JSON a salvar em benchmarks/ (ex.: baseline.json)')
+    parser.add_argument('--compare', help='arquivo JSON de baseline para comparação')
+    parser.add_argument('--threshold', type=float, default=0.2, help='piora relativa considerada regressão')
+    parser.add_argument('--list', action='store_true', help='apenas lista os benchmarks')
+    args = parser.parse_args()
+
+    # Nomes exatos primeiro: os colchetes dos nomes (ex.: "scaler_fit[real]") seriam lidos como
+    # classes de caracteres pelo glob
+    selected = [name for name in BENCHMARKS
+                if name in args.patterns or any(fnmatch.fnmatch(name, p) for p in args.patterns)]
+    if args.list:
+        print('\n'.join(selected))
+        raise SystemExit(0)
+
+    results = run(selected, args.data)
+
+    if args.save:
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        path = os.path.join(BENCHMARK_DIR, args.save)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f'Resultados salvos em {path}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            raise SystemExit(f'{len(regressions)} benchmark(s) com regressão acima de {args.threshold:.0%}')
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+
+from numpy_lstm import NumpyLSTM, model_arrays, read_arrays
+
+# Pacote do modelo servido pela aplicação: rede, scaler e metadados em um único arquivo
+BUNDLE_PATH = 'lstm_bundle.npz'
+BUNDLE_FORMAT = 1
+
+# Atributos do MinMaxScaler gravados no pacote
+_SCALER_ARRAYS = ('data_min_', 'data_max_', 'data_range_', 'scale_', 'min_')
+
+# Chaves dos metadados escritas pelo próprio save_bundle; as demais vêm de 'extra'
+_BASE_METADATA = ('format', 'window', 'features', 'scaler', 'training_data')
+
+# Metadados do pacote (lidos sem carregar a rede)
+BundleInfo = namedtuple('BundleInfo', ['scaler', 'window', 'features', 'metadata', 'content_hash'])
+
+# Pacote completo: rede pronta para inferência e metadados
+ModelBundle = namedtuple('ModelBundle', ['model', 'info'])
+
+
+# Metadados adicionais de um pacote (configuração, métricas etc.), para regravá-los em um novo pacote
+def extra_metadata(metadata):
+    return {key: value for key, value in metadata.items() if key not in _BASE_METADATA}
+
+
+# Função para calcular o hash do conteúdo (nomes e bytes de todos os arrays, exceto o próprio hash)
+def content_hash(arrays):
+    digest = hashlib.sha256()
+    for key in sorted(arrays):
+        if key == 'content_hash':
+            continue
+        digest.update(key.encode())
+        digest.update(np.ascontiguousarray(np.asarray(arrays[key])).tobytes())
+    return digest.hexdigest()
+
+
+# Função para gravar o pacote a partir de um modelo Keras e do scaler usado no treino
+def save_bundle(model, scaler, path=BUNDLE_PATH, features=('Close',), training_data=None, extra=None):
+    architecture, arrays = model_arrays(model)
+    metadata = {
+        'format': BUNDLE_FORMAT,
+        'window': int(model.input_shape[1]),
+        'features': list(features),
+        'scaler': {
+            'feature_range': list(scaler.feature_range),
+            'n_samples_seen': int(scaler.n_samples_seen_),
+        },
+        'training_data': training_data or {},
+        **(extra or {}),
+    }
+    arrays['architecture'] = np.asarray(json.dumps(architecture))
+    arrays['metadata'] = np.asarray(json.dumps(metadata, ensure_ascii=False))
+    for name in _SCALER_ARRAYS:
+        arrays[f'scaler_{name}'] = np.asarray(getattr(scaler, name), dtype=np.float64)
+    arrays['content_hash'] = np.asarray(content_hash(arrays))
+
+    # Escrever em um arquivo temporário e renomear, para que leitores nunca vejam um pacote parcial
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.npz')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez(f, **arrays)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+    return str(arrays['content_hash'])
+
+
+# Função para recriar o MinMaxScaler do treino, sem reajustá-lo
+def _restore_scaler(metadata, artifact):
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=tuple(metadata['scaler']['feature_range']))
+    for name in _SCALER_ARRAYS:
+        setattr(scaler, name, artifact[f'scaler_{name}'])
+    # Sem feature_names_in_: as previsões transformam arrays, e o scikit-learn avisaria a cada chamada
+    scaler.n_features_in_ = len(metadata['features'])
+    scaler.n_samples_seen_ = metadata['scaler']['n_samples_seen']
+    return scaler
+
+
+def _read_info(artifact):
+    metadata = json.loads(str(artifact['metadata']))
+    if metadata.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Formato de pacote não suportado: {metadata.get('format')}")
+    return BundleInfo(_restore_scaler(metadata, artifact), metadata['window'], metadata['features'],
+                      metadata, str(artifact['content_hash']))
+
+
+# Função para ler apenas os metadados e o scaler (os pesos da rede não são lidos)
+def read_info(path=BUNDLE_PATH):
+    with np.load(path) as artifact:
+        return _read_info(artifact)
+
+
+# Função para reconstruir o modelo Keras a partir da arquitetura e dos pesos do pacote
+def _keras_model(architecture, weights):
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+
+    model = Sequential()
+    model.add(Input(shape=tuple(architecture['input_shape'])))
+    for config in architecture['layers']:
+        if config['type'] == 'LSTM':
+            model.add(LSTM(config['units'], return_sequences=config['return_sequences'],
+                           activation=config['activation'], recurrent_activation=config['recurrent_activation']))
+        elif config['type'] == 'Dense':
+            model.add(Dense(config['units'], activation=config['activation']))
+        else:
+            model.add(Dropout(config['rate']))
+    model.set_weights([w for layer_weights in weights for w in layer_weights])
+    return model
+
+
+# Função para carregar o pacote em uma única leitura, conferindo o hash do conteúdo
+def load_bundle(path=BUNDLE_PATH, backend='keras'):
+    with np.load(path) as artifact:
+        arrays = {key: artifact[key] for key in artifact.files}
+    if content_hash(arrays) != str(arrays['content_hash']):
+        raise ValueError(f'Hash do conteúdo não confere: {path}')
+
+    info = _read_info(arrays)
+    architecture, weights = read_arrays(arrays)
+    if backend == 'numpy':
+        model = NumpyLSTM(architecture['layers'], weights, architecture.get('input_shape'))
+    else:
+        model = _keras_model(architecture, weights)
+    return ModelBundle(model, info)
+
+
+# Função para verificar se um arquivo .npz é um pacote de modelo (e não apenas pesos exportados)
+def is_bundle(path):
+    if not path.endswith('.npz') or not os.path.exists(path):
+        return False
+    with np.load(path) as artifact:
+        return 'metadata' in artifact.files
+
+
+# Função para criar o pacote de um modelo já treinado, com o scaler ajustado como no treino
+def create_bundle(model_path, csv_path, path=BUNDLE_PATH, extra=None):
+    from tensorflow.keras.models import load_model
+
+    from train import describe_data, load_series
+
+    df_LSTM, scaler, _ = load_series(csv_path)
+    return save_bundle(load_model(model_path), scaler, path, training_data=describe_data(df_LSTM, csv_path),
+                       extra=extra)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Cria ou inspeciona o pacote do modelo (rede, scaler e metadados).')
+    parser.add_argument('command', choices=['create', 'info'])
+    parser.add_argument('--model', default='lstm_model.keras', help='modelo Keras de origem')
+    parser.add_argument('--data', default='dados_petroleo.csv', help='CSV usado no treino do modelo')
+    parser.add_argument('--bundle', default=BUNDLE_PATH, help='arquivo do pacote')
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        print(f'Pacote {create_bundle(args.model, args.data, args.bundle)[:16]} salvo em {args.bundle}')
+    else:
+        info = read_info(args.bundle)
+        print(json.dumps({**info.metadata, 'content_hash': info.content_hash}, indent=2, ensure_ascii=False))
@@ -0,0 +1,63 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Função para criar uma estrutura de dados adequada para LSTM.
+# Equivalente ao create_dataset do notebook, mas X e Y são visões (sem cópia) sobre 'dataset':
+# X[i] = dataset[i:i + time_step, :] e Y[i] = dataset[i + time_step, 0] ('0' é a coluna de fechamento).
+def create_dataset(dataset, time_step=1):
+    dataset = np.asarray(dataset)
+    if dataset.ndim == 1:
+        dataset = dataset.reshape(-1, 1)
+
+    # Mantém o mesmo número de amostras do laço original: len(dataset) - time_step - 1
+    num_samples = len(dataset) - time_step - 1
+    if num_samples <= 0:
+        return np.array([]), np.array([])
+
+    # (amostras, features, time_step) -> (amostras, time_step, features), ainda como visão
+    windows = sliding_window_view(dataset, time_step, axis=0).transpose(0, 2, 1)
+    X = windows[:num_samples]
+    Y = dataset[time_step:time_step + num_samples, 0]
+    return X, Y
+
+
+# Função para criar todas as janelas da série, incluindo a que tem o último dia como alvo
+# (create_dataset mantém a contagem do notebook e descarta esta última amostra)
+def create_windows(dataset, time_step=1):
+    dataset = np.asarray(dataset)
+    if dataset.ndim == 1:
+        dataset = dataset.reshape(-1, 1)
+    if len(dataset) <= time_step:
+        return np.array([]), np.array([])
+
+    X = sliding_window_view(dataset[:-1], time_step, axis=0).transpose(0, 2, 1)
+    Y = dataset[time_step:, 0]
+    return X, Y
+
+
+# Função para gerar as janelas em lotes como um tf.data.Dataset, sem materializar todas de uma vez.
+# Cada lote é montado por índice (gather) a partir de uma única cópia da série.
+def make_tf_dataset(dataset, time_step=1, batch_size=32, shuffle=False, seed=None):
+    import tensorflow as tf
+
+    dataset = np.asarray(dataset, dtype=np.float32)
+    if dataset.ndim == 1:
+        dataset = dataset.reshape(-1, 1)
+    num_samples = max(len(dataset) - time_step - 1, 0)
+
+    series = tf.constant(dataset)
+    offsets = tf.range(time_step, dtype=tf.int64)
+
+    def gather_windows(starts):
+        X = tf.gather(series, starts[:, tf.newaxis] + offsets)
+        Y = tf.gather(series[:, 0], starts + time_step)
+        return X, Y
+
+    starts = tf.data.Dataset.range(num_samples)
+    if shuffle:
+        starts = starts.shuffle(max(num_samples, 1), seed=seed, reshuffle_each_iteration=True)
+    return (starts
+            .batch(batch_size)
+            .map(gather_windows, num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+# Diretório onde ficam os resultados das análises mais caras (decomposição e testes)
+EDA_CACHE_DIR = 'eda_cache'
+
+# Período da decomposição sazonal usado no notebook (dias úteis em um ano)
+DECOMPOSITION_PERIOD = 252
+
+# Janelas das médias móveis exibidas
+ROLLING_WINDOWS = (21, 252)
+
+
+class IncrementalStats:
+    """Estatísticas descritivas da série que são atualizadas ao acrescentar novas linhas.
+
+    Momentos e extremos são atualizados em O(novas linhas); os quantis usam uma
+    cópia ordenada em que os novos valores são inseridos; as médias móveis usam
+    somas acumuladas, estendidas apenas com os novos valores.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # soma dos quadrados dos desvios (Welford/Chan)
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.sorted_values = np.empty(0)
+        self.cumsum = np.zeros(1)
+        self.cumsum_sq = np.zeros(1)
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return self
+
+        # Combinação dos momentos do bloco novo com os existentes (algoritmo paralelo de Chan)
+        n_new = values.size
+        mean_new = values.mean()
+        m2_new = ((values - mean_new) ** 2).sum()
+        total = self.count + n_new
+        delta = mean_new - self.mean
+        self.m2 += m2_new + delta ** 2 * self.count * n_new / total
+        self.mean += delta * n_new / total
+        self.count = total
+
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+
+        new_sorted = np.sort(values)
+        self.sorted_values = np.insert(self.sorted_values, np.searchsorted(self.sorted_values, new_sorted), new_sorted)
+
+        self.cumsum = np.concatenate([self.cumsum, self.cumsum[-1] + np.cumsum(values)])
+        self.cumsum_sq = np.concatenate([self.cumsum_sq, self.cumsum_sq[-1] + np.cumsum(values ** 2)])
+        return self
+
+    @property
+    def std(self):
+        # Desvio padrão amostral (ddof=1), como no describe() do pandas
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float('nan')
+
+    # Quantil com interpolação linear, como no describe() do pandas
+    def quantile(self, q):
+        return float(np.percentile(self.sorted_values, q * 100))
+
+    # Média e desvio padrão móveis, calculados a partir das somas acumuladas
+    def rolling(self, window):
+        if self.count < window:
+            return np.empty(0), np.empty(0)
+        sums = self.cumsum[window:] - self.cumsum[:-window]
+        sums_sq = self.cumsum_sq[window:] - self.cumsum_sq[:-window]
+        mean = sums / window
+        variance = np.maximum(sums_sq - sums * mean, 0) / (window - 1)
+        return mean, np.sqrt(variance)
+
+    def describe(self):
+        return {
+            'Volume de Dados': self.count,
+            'Média': float(self.mean),
+            'Desvio Padrão': self.std,
+            'Mínimo': float(self.minimum),
+            'Quartil 1': self.quantile(0.25),
+            'Mediana': self.quantile(0.5),
+            'Quartil 3': self.quantile(0.75),
+            'Máximo': float(self.maximum),
+            'Coeficiente de Variação': float(self.std / self.mean * 100),
+        }
+
+
+# Função para calcular a decomposição e os testes estatísticos do notebook
+def compute_expensive(values, period=DECOMPOSITION_PERIOD):
+    import pandas as pd
+    from scipy.stats import shapiro
+    from statsmodels.tsa.seasonal import seasonal_decompose
+    from statsmodels.tsa.stattools import adfuller
+
+    values = np.asarray(values, dtype=np.float64)
+
+    # Teste Estatístico - Fuller
+    adf = adfuller(values)
+    # Teste de normalidade dos dados
+    shapiro_result = shapiro(values)
+    # Decomposição da série
+    resultados = seasonal_decompose(pd.Series(values), period=period)
+
+    tests = {
+        'adf_statistic': float(adf[0]),
+        'adf_pvalue': float(adf[1]),
+        'adf_critical_values': {key: float(value) for key, value in adf[4].items()},
+        'shapiro_statistic': float(shapiro_result.statistic),
+        'shapiro_pvalue': float(shapiro_result.pvalue),
+    }
+    decomposition = {
+        'trend': resultados.trend.to_numpy(),
+        'seasonal': resultados.seasonal.to_numpy(),
+        'resid': resultados.resid.to_numpy(),
+    }
+    return tests, decomposition
+
+
+class EDAEngine:
+    """Estatísticas da análise exploratória calculadas a partir dos dados atuais, por versão.
+
+    Quando a nova versão apenas acrescenta linhas à anterior, as estatísticas
+    descritivas são atualizadas de forma incremental. A decomposição e os testes
+    ADF/Shapiro só são recalculados quando a versão dos dados muda, e ficam
+    salvos em disco para sobreviver a reinícios do processo.
+    """
+
+    def __init__(self, cache_dir=EDA_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self.version = None
+        self.stats = None
+        self._last_date = None
+        self._last_close = None
+        self._expensive = {}  # versão -> (testes, decomposição)
+
+    # Atualiza as estatísticas descritivas para a versão atual dos dados
+    def update(self, df, version):
+        with self._lock:
+            if version == self.version:
+                return self.stats
+
+            dates = df['Date'].to_numpy()
+            close = df['Close'].to_numpy(dtype=np.float64)
+            n = self.stats.count if self.stats is not None else 0
+
+            # Apenas linhas novas ao final: atualização incremental. Além da última linha conhecida,
+            # as somas do prefixo precisam bater, para detectar linhas anteriores reescritas
+            if (self.stats is not None and len(close) >= n
+                    and dates[n - 1] == self._last_date and close[n - 1] == self._last_close
+                    and self._same_prefix(close[:n])):
+                stats = self.stats
+                stats.extend(close[n:])
+            else:
+                stats = IncrementalStats().extend(close)
+
+            self.stats = stats
+            self.version = version
+            self._last_date = dates[-1]
+            self._last_close = close[-1]
+            return stats
+
+    # Compara a soma e a soma dos quadrados do prefixo com as somas acumuladas guardadas
+    def _same_prefix(self, prefix):
+        return (np.isclose(self.stats.cumsum[-1], prefix.sum(), rtol=1e-11, atol=0)
+                and np.isclose(self.stats.cumsum_sq[-1], (prefix ** 2).sum(), rtol=1e-11, atol=0))
+
+    def describe(self, df, version):
+        return self.update(df, version).describe()
+
+    def rolling(self, df, version, window):
+        return self.update(df, version).rolling(window)
+
+    def _cache_paths(self, version):
+        base = os.path.join(self.cache_dir, f'eda_{version[:16]}')
+        return f'{base}.json', f'{base}.npz'
+
+    # Decomposição e testes estatísticos, recalculados apenas quando a versão dos dados muda
+    def expensive(self, df, version):
+        cached = self._expensive.get(version)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            cached = self._expensive.get(version)
+            if cached is not None:
+                return cached
+
+            json_path, npz_path = self._cache_paths(version)
+            try:
+                with open(json_path, encoding='utf-8') as f:
+                    tests = json.load(f)
+                with np.load(npz_path) as artifact:
+                    decomposition = {key: artifact[key] for key in artifact.files}
+            except (OSError, ValueError):
+                tests, decomposition = compute_expensive(df['Close'].to_numpy())
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.savez(npz_path, **decomposition)
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(tests, f, indent=2)
+
+            # Mantém apenas a versão atual em memória
+            self._expensive = {version: (tests, decomposition)}
+            return tests, decomposition
+
+
+# Instância compartilhada por todas as sessões do processo
+engine = EDAEngine()
@@ -0,0 +1,164 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Largura padrão do gráfico, em pixels: o número de pontos enviados ao navegador não passa disso
+PIXEL_WIDTH = 1200
+
+# Fator de redução entre níveis consecutivos de resolução
+LEVEL_FACTOR = 4
+
+# Consultas já reduzidas mantidas em memória para a versão atual dos dados
+QUERY_CACHE_SIZE = 64
+
+# Métodos de redução disponíveis
+METHODS = ('lttb', 'minmax')
+
+# Eventos analisados no painel do Power BI
+Event = namedtuple('Event', ['name', 'start', 'end'])
+
+EVENTS = (
+    Event('Invasão do Kuwait pelo Iraque', pd.Timestamp('1990-08-01'), pd.Timestamp('1991-02-28')),
+    Event('Ataques de 11 de Setembro e Guerra ao Terror', pd.Timestamp('2001-09-01'), pd.Timestamp('2003-12-31')),
+    Event('Crise Financeira Global', pd.Timestamp('2008-09-01'), pd.Timestamp('2009-03-31')),
+    Event('Pandemia Covid-19', pd.Timestamp('2020-03-01'), pd.Timestamp('2023-05-31')),
+)
+
+
+# Eventos que têm alguma interseção com o período informado
+def events_in_range(start, end, events=EVENTS):
+    return [event for event in events if event.start <= end and event.end >= start]
+
+
+# Função para reduzir a série com o Largest-Triangle-Three-Buckets; retorna os índices mantidos
+def lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Limites dos baldes (o primeiro e o último ponto ficam sempre)
+    edges = np.floor(np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # Médias de cada balde, pelas somas acumuladas (o "balde" seguinte ao último é o ponto final)
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+    counts = np.diff(edges)
+    avg_x = np.append((cum_x[edges[1:]] - cum_x[edges[:-1]]) / counts, x[-1])
+    avg_y = np.append((cum_y[edges[1:]] - cum_y[edges[:-1]]) / counts, y[-1])
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Ponto do balde que forma o maior triângulo com o ponto anterior e a média do próximo balde
+        areas = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
+
+# Função para reduzir a série mantendo o mínimo e o máximo de cada balde; retorna os índices mantidos
+def minmax(x, y, n_out):
+    n = len(x)
+    buckets = n_out // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    # Ordena por balde e, dentro de cada balde, por preço: o primeiro é o mínimo e o último, o máximo
+    bucket_ids = np.repeat(np.arange(buckets), np.diff(edges))
+    order = np.lexsort((np.asarray(y, dtype=np.float64), bucket_ids))
+    starts, ends = edges[:-1], edges[1:]
+    filled = ends > starts
+    return np.unique(np.concatenate([order[starts[filled]], order[ends[filled] - 1]]))
+
+
+_DOWNSAMPLERS = {'lttb': lttb, 'minmax': minmax}
+
+
+class PriceExplorer:
+    """Série completa de preços reduzida no servidor para a largura do gráfico.
+
+    Para cada versão dos dados é montada uma pirâmide de resoluções: o nível 0
+    é a série diária e cada nível seguinte guarda o mínimo e o máximo por balde,
+    com LEVEL_FACTOR vezes menos pontos que o anterior. Uma consulta usa o nível
+    mais grosso que ainda tem pontos suficientes no intervalo e só então aplica
+    o LTTB (ou mín-máx), então o custo depende da largura do gráfico, não do
+    tamanho do histórico.
+    """
+
+    def __init__(self, factor=LEVEL_FACTOR, cache_size=QUERY_CACHE_SIZE):
+        self.factor = factor
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self.version = None
+        self.levels = []  # [(datas em ns, preços), ...], do mais fino ao mais grosso
+        self._queries = OrderedDict()
+
+    # Monta os níveis de resolução para a versão atual dos dados
+    def update(self, df, version):
+        with self._lock:
+            if version == self.version:
+                return self.levels
+
+            x = df['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+            y = df['Close'].to_numpy(dtype=np.float64)
+            levels = [(x, y)]
+            # Cada nível é montado a partir do anterior, com LEVEL_FACTOR vezes menos pontos
+            while len(x) > 2 * self.factor:
+                indices = minmax(x, y, len(x) // self.factor)
+                x, y = x[indices], y[indices]
+                levels.append((x, y))
+
+            self.levels = levels
+            self.version = version
+            self._queries.clear()
+            return levels
+
+    # Série reduzida entre 'start' e 'end' para 'width' pixels: (datas, preços, nível usado)
+    def query(self, df, version, start=None, end=None, width=PIXEL_WIDTH, method='lttb'):
+        if method not in _DOWNSAMPLERS:
+            raise ValueError(f'Método de redução desconhecido: {method}')
+        levels = self.update(df, version)
+
+        start = pd.Timestamp(start).value if start is not None else levels[0][0][0]
+        end = pd.Timestamp(end).value if end is not None else levels[0][0][-1]
+        key = (version, start, end, width, method)
+        with self._lock:
+            cached = self._queries.get(key)
+            if cached is not None:
+                self._queries.move_to_end(key)
+                return cached
+
+        # Nível mais grosso com ao menos dois pontos por pixel no intervalo
+        for level in range(len(levels) - 1, -1, -1):
+            x, y = levels[level]
+            lo = int(np.searchsorted(x, start, side='left'))
+            hi = int(np.searchsorted(x, end, side='right'))
+            if hi - lo >= 2 * width or level == 0:
+                break
+
+        # Um ponto além de cada borda, para a linha não começar ou terminar cortada
+        lo, hi = max(lo - 1, 0), min(hi + 1, len(x))
+        x, y = x[lo:hi], y[lo:hi]
+        indices = _DOWNSAMPLERS[method](x, y, width)
+        result = (x[indices].astype('datetime64[ns]'), y[indices], level)
+
+        with self._lock:
+            if self.version == version:
+                self._queries[key] = result
+                while len(self._queries) > self.cache_size:
+                    self._queries.popitem(last=False)
+        return result
+
+
+# Instância compartilhada por todas as sessões do processo
+explorer = PriceExplorer()
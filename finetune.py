@@ -0,0 +1,123 @@
+import json
+import time
+
+import numpy as np
+
+from dataset import create_windows
+from bundle import BUNDLE_PATH, extra_metadata, is_bundle, read_info, save_bundle
+from train import MODEL_PATH, describe_data, evaluate, load_series, save_model, set_seed
+
+# Arquivo com o resultado do último ajuste incremental
+FINETUNE_METRICS_PATH = 'metricas_ajuste.json'
+
+# Configuração padrão do ajuste incremental
+DEFAULT_FINETUNE_CONFIG = {
+    'window_days': 250,
+    'holdout_days': 20,
+    'epochs': 3,
+    'batch_size': 32,
+    'learning_rate': 1e-4,
+    'tolerance': 0.0,
+    'seed': 42,
+}
+
+
+# Função para treinar brevemente o modelo já carregado em um conjunto de janelas
+def _fit(model, X, y, config):
+    from tensorflow.keras.optimizers import Adam
+
+    # Taxa de aprendizado baixa para ajustar sem "esquecer" o treinamento original
+    model.compile(optimizer=Adam(learning_rate=config['learning_rate']), loss='mean_squared_error')
+    model.fit(X, y, batch_size=config['batch_size'], epochs=config['epochs'], shuffle=True, verbose=0)
+
+
+# Função para ajustar o modelo existente aos dias mais recentes, promovendo-o apenas se não piorar
+def fine_tune(model_path=MODEL_PATH, csv_path='dados_petroleo.csv', config=None, output_path=None,
+              bundle_path=BUNDLE_PATH):
+    from tensorflow.keras.models import load_model
+
+    config = {**DEFAULT_FINETUNE_CONFIG, **(config or {})}
+    set_seed(config['seed'])
+    start = time.perf_counter()
+
+    model = load_model(model_path)
+    time_step = model.input_shape[1]
+    df_LSTM, scaler, scaled_data = load_series(csv_path)
+    training_data, extra = describe_data(df_LSTM, csv_path), {}
+    if bundle_path and is_bundle(bundle_path):
+        # Mantém a escala do treino, gravada no pacote: reajustar o scaler com os novos dias
+        # mudaria as entradas que o modelo já conhece
+        info = read_info(bundle_path)
+        scaler = info.scaler
+        scaled_data = scaler.transform(df_LSTM[['Close']].to_numpy())
+        # Metadados do treino original, preservados no pacote ajustado
+        training_data, extra = info.metadata['training_data'], extra_metadata(info.metadata)
+
+    holdout_days = config['holdout_days']
+    window_days = config['window_days']
+
+    # Ajuste: os 'window_days' alvos mais recentes, até o último pregão; holdout: os 'holdout_days'
+    # alvos imediatamente anteriores, fora da janela de ajuste. O modelo salvo é exatamente o que foi validado.
+    X_recent, y_recent = create_windows(scaled_data[-(window_days + time_step):], time_step)
+    X_holdout, y_holdout = create_windows(
+        scaled_data[-(window_days + holdout_days + time_step):-window_days], time_step)
+
+    baseline = evaluate(model, X_holdout, y_holdout, scaler)
+    _fit(model, np.asarray(X_recent), np.asarray(y_recent), config)
+    candidate = evaluate(model, X_holdout, y_holdout, scaler)
+
+    promoted = candidate['RMSE'] <= baseline['RMSE'] * (1 + config['tolerance'])
+    if promoted:
+        save_model(model, output_path or model_path)
+        if bundle_path:
+            # O ajuste fica registrado à parte: dados da janela usada e índice da linha seguinte a ela
+            window_data = {**describe_data(df_LSTM.iloc[-(window_days + time_step):], csv_path),
+                           'end_row': len(df_LSTM)}
+            extra['finetune'] = {'config': config, 'training_data': window_data, 'test': candidate}
+            save_bundle(model, scaler, bundle_path, training_data=training_data, extra=extra)
+
+    return {
+        'config': config,
+        'time_step': time_step,
+        'baseline': baseline,
+        'candidate': candidate,
+        'promoted': promoted,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ajusta o modelo LSTM existente aos pregões mais recentes.')
+    parser.add_argument('--model', default=MODEL_PATH, help='modelo .keras a ser ajustado')
+    parser.add_argument('--data', default='dados_petroleo.csv', help='CSV com as colunas Date e Close')
+    parser.add_argument('--output', help='onde salvar o modelo promovido (padrão: sobrescreve --model)')
+    parser.add_argument('--bundle', default=BUNDLE_PATH, help='pacote do modelo usado na aplicação')
+    parser.add_argument('--metrics', default=FINETUNE_METRICS_PATH, help='arquivo JSON com o resultado')
+    parser.add_argument('--window-days', type=int, default=DEFAULT_FINETUNE_CONFIG['window_days'])
+    parser.add_argument('--holdout-days', type=int, default=DEFAULT_FINETUNE_CONFIG['holdout_days'])
+    parser.add_argument('--epochs', type=int, default=DEFAULT_FINETUNE_CONFIG['epochs'])
+    parser.add_argument('--learning-rate', type=float, default=DEFAULT_FINETUNE_CONFIG['learning_rate'])
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_FINETUNE_CONFIG['tolerance'],
+                        help='piora relativa de RMSE aceita para promover o modelo')
+    parser.add_argument('--no-export', action='store_true', help='não exportar os pesos para o backend NumPy')
+    args = parser.parse_args()
+
+    result = fine_tune(args.model, args.data, {
+        'window_days': args.window_days,
+        'holdout_days': args.holdout_days,
+        'epochs': args.epochs,
+        'learning_rate': args.learning_rate,
+        'tolerance': args.tolerance,
+    }, output_path=args.output, bundle_path=args.bundle)
+
+    if result['promoted'] and not args.no_export:
+        from numpy_lstm import export_weights, weights_path_for
+
+        output = args.output or args.model
+        export_weights(output, weights_path_for(output))
+
+    with open(args.metrics, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(json.dumps({k: result[k] for k in ('baseline', 'candidate', 'promoted', 'seconds')}, indent=2))
@@ -0,0 +1,188 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pandas as pd
+import tornado.web
+
+from forecast_store import cached_predictions
+from forecasting import FORECAST_ENGINE, MAX_FORECAST_DAYS, is_weekday
+from instrumentation import snapshot, to_prometheus
+from registry import DEFAULT_ASSET, get_asset, get_asset_data, get_asset_serving
+from resources import model_cache
+
+# Janela de agrupamento das requisições concorrentes (em segundos)
+BATCH_WINDOW = 0.005
+
+
+class ForecastBatcher:
+    """Agrupa as requisições que chegam dentro de alguns milissegundos em uma única previsão.
+
+    As requisições de um mesmo ativo partem da mesma janela histórica, então a
+    previsão até a maior data pedida contém a resposta de todas as outras (o
+    horizonte recursivo de um dia não depende dos dias seguintes). Requisições
+    idênticas em andamento compartilham o mesmo resultado.
+    """
+
+    def __init__(self, window=BATCH_WINDOW, num_days=None, max_forecast_days=MAX_FORECAST_DAYS,
+                 engine=FORECAST_ENGINE):
+        self.window = window
+        self.num_days = num_days  # None: janela do treino, gravada no pacote do modelo
+        self.max_forecast_days = max_forecast_days
+        self.engine = engine
+        self._in_flight = {}  # (ativo, data final) -> Future, até a previsão terminar
+        self._queued = {}  # requisições ainda não enviadas a um lote
+        self._flush_scheduled = False
+        self._flush_tasks = set()  # referências aos lotes em execução, para não serem coletadas
+        self.batches = 0
+        self.requests = 0
+        self.deduplicated = 0
+
+    async def forecast(self, end_date, ticker=DEFAULT_ASSET):
+        self.requests += 1
+        key = (ticker, end_date)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[key] = future
+        self._queued[key] = future
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_later(self.window, self._start_flush)
+        return await asyncio.shield(future)
+
+    def _start_flush(self):
+        task = asyncio.ensure_future(self._flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self):
+        # Os futures continuam em '_in_flight' até serem resolvidos, para deduplicar também
+        # as requisições idênticas que chegam enquanto o lote é calculado
+        pending, self._queued = self._queued, {}
+        self._flush_scheduled = False
+
+        by_asset = {}
+        for (ticker, end_date), future in pending.items():
+            by_asset.setdefault(ticker, {})[end_date] = future
+        # Os lotes de ativos diferentes são calculados em paralelo
+        await asyncio.gather(*(self._flush_asset(ticker, futures) for ticker, futures in by_asset.items()))
+
+    async def _flush_asset(self, ticker, pending):
+        self.batches += 1
+
+        # Uma única chamada ao modelo (ou ao artefato pré-calculado) até a maior data pedida
+        horizon_end = max(pending)
+        asset = get_asset(ticker)
+        loop = asyncio.get_running_loop()
+        try:
+            df_close = await loop.run_in_executor(None, get_asset_data, ticker)
+            serving = await loop.run_in_executor(None, get_asset_serving, ticker)
+            predictions = await loop.run_in_executor(
+                None, lambda: cached_predictions(df_close, serving.scaler, horizon_end,
+                                                 self.num_days or serving.window, self.max_forecast_days,
+                                                 engine=self.engine, model_path=serving.model_path,
+                                                 data_path=asset.data))
+        except Exception as error:
+            for end_date, future in pending.items():
+                self._in_flight.pop((ticker, end_date), None)
+                future.set_exception(error)
+            return
+
+        for end_date, future in pending.items():
+            self._in_flight.pop((ticker, end_date), None)
+            future.set_result([(day, price) for day, price in predictions if day <= end_date])
+
+    def stats(self):
+        return {'requests': self.requests, 'batches': self.batches, 'deduplicated': self.deduplicated}
+
+
+class ForecastHandler(tornado.web.RequestHandler):
+    def initialize(self, batcher):
+        self.batcher = batcher
+
+    def write_error(self, status_code, **kwargs):
+        self.finish({'error': self._reason})
+
+    async def get(self):
+        ticker = self.get_query_argument('asset', DEFAULT_ASSET)
+        try:
+            get_asset(ticker)
+        except ValueError as error:
+            raise tornado.web.HTTPError(404, reason=str(error))
+
+        until = self.get_query_argument('until', None)
+        if until is None:
+            raise tornado.web.HTTPError(400, reason="Informe o parâmetro 'until' (YYYY-MM-DD)")
+        try:
+            end_date = pd.Timestamp(until)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason=f'Data inválida: {until}')
+        if pd.isna(end_date):
+            raise tornado.web.HTTPError(400, reason=f'Data inválida: {until}')
+        # Apenas a data do calendário importa: o fuso horário informado é descartado
+        end_date = end_date.tz_localize(None).normalize()
+
+        # Mesmas regras da página de previsão: a partir do dia seguinte ao último dado, até o horizonte máximo
+        df_close = await asyncio.get_running_loop().run_in_executor(None, get_asset_data, ticker)
+        last_date = df_close['Date'].max()
+        max_forecast_date = last_date + timedelta(days=self.batcher.max_forecast_days)
+        if not last_date < end_date <= max_forecast_date:
+            raise tornado.web.HTTPError(
+                400, reason=f'A data deve estar entre {(last_date + timedelta(days=1)).date()} e {max_forecast_date.date()}')
+
+        predictions = await self.batcher.forecast(end_date, ticker)
+        self.write({
+            'asset': ticker,
+            'last_date': str(last_date.date()),
+            'until': str(end_date.date()),
+            'business_day': is_weekday(end_date),
+            'predictions': [{'date': str(day.date()), 'price': float(price)} for day, price in predictions],
+        })
+
+
+class StatsHandler(tornado.web.RequestHandler):
+    def initialize(self, batcher):
+        self.batcher = batcher
+
+    def get(self):
+        self.set_header('Content-Type', 'application/json')
+        self.write(json.dumps({'batcher': self.batcher.stats(), 'models': model_cache.stats(),
+                               'metrics': snapshot()}, default=str))
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header('Content-Type', 'text/plain; version=0.0.4')
+        self.write(to_prometheus())
+
+
+# Função para criar a aplicação HTTP
+def make_app(batcher=None):
+    batcher = batcher or ForecastBatcher()
+    return tornado.web.Application([
+        (r'/forecast', ForecastHandler, {'batcher': batcher}),
+        (r'/stats', StatsHandler, {'batcher': batcher}),
+        (r'/metrics', MetricsHandler),
+    ])
+
+
+async def main(port):
+    app = make_app()
+    app.listen(port)
+    print(f'Serviço de previsão em http://localhost:{port}/forecast?until=YYYY-MM-DD&asset={DEFAULT_ASSET}')
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serviço HTTP de previsão do preço do Petróleo Brent.')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.port))
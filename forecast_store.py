@@ -0,0 +1,103 @@
+import os
+import tempfile
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from forecasting import generate_predictions
+from instrumentation import increment, span
+from resources import DATA_PATH, file_version, get_model, model_resource
+
+# Diretório onde ficam as previsões pré-calculadas
+STORE_DIR = 'previsoes'
+
+
+# Função para montar o caminho do artefato de uma combinação (modelo, dados, janela)
+def store_path(model_version, data_version, num_days, directory=STORE_DIR):
+    return os.path.join(directory, f'previsao_{model_version[:16]}_{data_version[:16]}_{num_days}.npz')
+
+
+# Função para calcular todo o horizonte de previsão e salvá-lo em disco
+def precompute(df, model, scaler, num_days, max_forecast_days, model_version, data_version,
+               engine='graph', directory=STORE_DIR):
+    last_date = df['Date'].max()
+    predictions = generate_predictions(df, model, scaler, last_date + timedelta(days=max_forecast_days),
+                                       num_days, engine=engine)
+    dates = np.array([d for d, _ in predictions], dtype='datetime64[ns]')
+    prices = np.array([p for _, p in predictions], dtype=np.float64)
+
+    os.makedirs(directory, exist_ok=True)
+    path = store_path(model_version, data_version, num_days, directory)
+
+    # Escrever em um arquivo temporário e renomear, para que leitores nunca vejam um artefato parcial
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez(f, dates=dates, prices=prices, model_version=model_version,
+                 data_version=data_version, num_days=num_days, max_forecast_days=max_forecast_days)
+    os.replace(tmp_path, path)
+    return dates, prices
+
+
+# Função para ler um artefato; retorna None se ele não existir ou não bater com as versões atuais
+def load_forecast(model_version, data_version, num_days, max_forecast_days, directory=STORE_DIR):
+    path = store_path(model_version, data_version, num_days, directory)
+    try:
+        with np.load(path) as artifact:
+            if (str(artifact['model_version']) != model_version
+                    or str(artifact['data_version']) != data_version
+                    or int(artifact['num_days']) != num_days
+                    or int(artifact['max_forecast_days']) < max_forecast_days):
+                return None
+            return artifact['dates'], artifact['prices']
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+# Função para recortar o horizonte pré-calculado até a data selecionada
+def predictions_until(forecast, end_date):
+    dates, prices = forecast
+    end = np.datetime64(pd.Timestamp(end_date), 'ns')
+    count = int(np.searchsorted(dates, end, side='right'))
+    return [(pd.Timestamp(d), p) for d, p in zip(dates[:count], prices[:count])]
+
+
+# Função para obter as previsões até 'end_date' a partir do artefato, com inferência ao vivo como fallback
+def cached_predictions(df, scaler, end_date, num_days, max_forecast_days, engine='graph',
+                       model_path=None, data_path=DATA_PATH, directory=STORE_DIR):
+    model_version = file_version(model_path or model_resource.path)
+    data_version = file_version(data_path)
+
+    with span('forecast_store_read'):
+        forecast = load_forecast(model_version, data_version, num_days, max_forecast_days, directory)
+    if forecast is None:
+        # Artefato ausente ou desatualizado: calcula ao vivo e já deixa salvo para as próximas chamadas
+        increment('forecast_store_miss')
+        forecast = precompute(df, get_model(model_path), scaler, num_days, max_forecast_days,
+                              model_version, data_version, engine=engine, directory=directory)
+    else:
+        increment('forecast_store_hit')
+    return predictions_until(forecast, end_date)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from registry import DEFAULT_ASSET, get_asset, get_asset_data, get_asset_serving
+
+    parser = argparse.ArgumentParser(description='Pré-calcula o horizonte de previsão para o modelo e os dados atuais.')
+    parser.add_argument('--asset', default=DEFAULT_ASSET, help='ativo cadastrado em ativos.json')
+    parser.add_argument('--num-days', type=int, help='dias históricos usados como janela (padrão: a do treino)')
+    parser.add_argument('--max-forecast-days', type=int, default=15, help='horizonte máximo em dias corridos')
+    parser.add_argument('--engine', default='graph', help='motor de previsão')
+    args = parser.parse_args()
+
+    asset = get_asset(args.asset)
+    df_close = get_asset_data(args.asset)
+    serving = get_asset_serving(args.asset)
+    num_days = args.num_days or serving.window
+    model_version = file_version(serving.model_path)
+    data_version = file_version(asset.data)
+    dates, prices = precompute(df_close, get_model(serving.model_path), serving.scaler, num_days,
+                               args.max_forecast_days, model_version, data_version, engine=args.engine)
+    print(f'{len(dates)} previsões salvas em {store_path(model_version, data_version, num_days)}')
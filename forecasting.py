@@ -0,0 +1,174 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import increment, span
+from numpy_lstm import NumpyLSTM
+
+# TensorFlow é importado sob demanda, apenas quando uma previsão é de fato executada
+
+# Motores de previsão disponíveis
+ENGINES = ('keras', 'graph')
+
+# Defina o número de dias históricos a serem usados para a previsão
+NUM_DAYS = 60  # Ajuste conforme necessário
+
+# Limite o horizonte de previsão
+MAX_FORECAST_DAYS = 15  # Limite de 15 dias para previsão
+
+# Motor de previsão: 'graph' executa todo o horizonte em um único grafo compilado,
+# 'keras' mantém o laço original com uma chamada a model.predict por dia
+FORECAST_ENGINE = 'graph'
+
+# Atributo do modelo com as suas funções compiladas (tf.function), para não recompilar a cada chamada.
+# Ficam no próprio modelo: como a função referencia o modelo, um cache externo o manteria vivo
+# depois de removido do cache de modelos.
+_FORECASTERS_ATTR = '_previsao_forecasters'
+
+
+# Função para verificar se uma data é um dia útil
+def is_weekday(date):
+    return date.weekday() < 5  # 0 é segunda-feira, 4 é sexta-feira
+
+
+# Função para listar os dias úteis após o último dado histórico até a data selecionada
+def forecast_dates(df, end_date):
+    end_date = pd.Timestamp(end_date)
+    current_date = df['Date'].max() + timedelta(days=1)
+
+    dates = []
+    while current_date <= end_date:
+        if is_weekday(current_date):
+            dates.append(current_date)
+        current_date += timedelta(days=1)
+    return dates
+
+
+# Função para obter (ou compilar) o laço autorregressivo completo como um único grafo.
+# Com mc_dropout=True as camadas de Dropout ficam ativas (Monte Carlo Dropout).
+def _graph_forecaster(model, mc_dropout=False):
+    compiled = model.__dict__.get(_FORECASTERS_ATTR)
+    if compiled is None:
+        compiled = {}
+        # object.__setattr__ evita que o Keras rastreie o dicionário como parte do modelo
+        object.__setattr__(model, _FORECASTERS_ATTR, compiled)
+    forecaster = compiled.get(mc_dropout)
+    if forecaster is None:
+        import tensorflow as tf
+
+        @tf.function(reduce_retracing=True)
+        def forecaster(windows, steps):
+            predictions = tf.TensorArray(tf.float32, size=steps)
+            for i in tf.range(steps):
+                prediction = model(windows, training=mc_dropout)
+                predictions = predictions.write(i, prediction)
+                # Desliza a janela e adiciona a previsão ao final da sequência
+                windows = tf.concat([windows[:, 1:, :], prediction[:, tf.newaxis, :]], axis=1)
+            # (steps, N, 1) -> (N, steps)
+            return tf.transpose(predictions.stack()[:, :, 0])
+
+        compiled[mc_dropout] = forecaster
+    return forecaster
+
+
+# Função para prever 'steps' passos à frente para N janelas normalizadas (N, janela, 1) de uma só vez
+def forecast_scaled(model, windows, steps, mc_dropout=False):
+    windows = np.asarray(windows, dtype=np.float32)
+    if steps == 0:
+        return np.empty((windows.shape[0], 0), dtype=np.float32)
+    increment('forecast_steps', steps)
+    if isinstance(model, NumpyLSTM):
+        # Backend leve: o mesmo laço executado em NumPy, sem TensorFlow
+        with span('forecast_numpy'):
+            return model.forecast(windows, steps, mc_dropout=mc_dropout)
+    import tensorflow as tf
+
+    with span('forecast_graph'):
+        forecaster = _graph_forecaster(model, mc_dropout)
+        return forecaster(tf.constant(windows), tf.constant(steps, dtype=tf.int32)).numpy()
+
+
+# Função para prever em lote a partir de N janelas de preços (N, janela), com 'samples' amostras
+# estocásticas por janela quando mc_dropout=True. Retorna os preços com formato (N, samples, steps).
+def batch_forecast(model, scaler, windows, steps, samples=1, mc_dropout=False):
+    windows = np.asarray(windows, dtype=np.float64)
+    if windows.ndim == 1:
+        windows = windows[np.newaxis]
+    if samples > 1 and not mc_dropout:
+        raise ValueError('Mais de uma amostra por janela só faz sentido com mc_dropout=True')
+
+    n_windows, window_size = windows.shape
+    if steps == 0:
+        return np.empty((n_windows, samples, 0))
+    windows_scaled = scaler.transform(windows.reshape(-1, 1)).reshape(n_windows, window_size, 1)
+
+    # Todas as janelas e amostras avançam juntas como um único tensor (N * samples, janela, 1)
+    batch = np.repeat(windows_scaled, samples, axis=0)
+    predictions_scaled = forecast_scaled(model, batch, steps, mc_dropout=mc_dropout)
+
+    predictions = scaler.inverse_transform(
+        predictions_scaled.reshape(-1, 1).astype(np.float64)
+    ).reshape(n_windows, samples, steps)
+    return predictions
+
+
+# Função para gerar as faixas de incerteza (percentis) da previsão via Monte Carlo Dropout
+def forecast_bands(df, model, scaler, end_date, num_days, samples=100, percentiles=(5, 50, 95)):
+    dates = forecast_dates(df, end_date)
+    last_days = df['Close'].values[-num_days:]
+
+    predictions = batch_forecast(model, scaler, last_days, len(dates), samples=samples, mc_dropout=True)[0]
+
+    bands = pd.DataFrame({'Data': dates})
+    for q, values in zip(percentiles, np.percentile(predictions, percentiles, axis=0)):
+        bands[f'P{q}'] = values
+    return bands
+
+
+# Função para gerar previsões a partir de um número configurável de dias até a data selecionada
+def generate_predictions(df, model, scaler, end_date, num_days, engine='keras'):
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de previsão desconhecido: {engine!r} (use um de {ENGINES})")
+
+    # Prepare uma sequência de dados para prever
+    last_days = df[['Close']].values[-num_days:]  # Pega os últimos 'num_days' dias
+    last_days_scaled = scaler.transform(last_days)
+
+    dates = forecast_dates(df, end_date)
+    if not dates:
+        return []
+
+    if engine == 'graph':
+        # Todo o horizonte em uma única chamada ao grafo compilado
+        predictions_scaled = forecast_scaled(model, last_days_scaled[np.newaxis], len(dates))[0]
+
+        # Reverter a normalização de uma só vez
+        with span('inverse_transform'):
+            predictions = scaler.inverse_transform(
+                predictions_scaled.reshape(-1, 1).astype(np.float64)
+            )[:, 0]
+        return list(zip(dates, predictions))
+
+    predictions = []
+    for current_date in dates:
+        # Adicionar a previsão ao final da sequência
+        date_array_scaled = np.array([last_days_scaled])
+
+        # Fazer a previsão
+        with span('model_predict'):
+            prediction_scaled = model.predict(date_array_scaled)
+        increment('forecast_steps')
+
+        # Reverter a normalização
+        with span('inverse_transform'):
+            prediction = scaler.inverse_transform(
+                np.concatenate((prediction_scaled, np.zeros((prediction_scaled.shape[0], df.shape[1] - 1))), axis=1)
+            )[:, 0]
+
+        predictions.append((current_date, prediction[0]))
+
+        # Atualizar a sequência de dados para a próxima previsão
+        last_days_scaled = np.append(last_days_scaled[1:], prediction_scaled, axis=0)
+
+    return predictions
@@ -0,0 +1,232 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from resources import file_hash
+from train import DEFAULT_CONFIG
+
+# Arquivo com um registro (JSON) por tentativa já concluída
+RESULTS_PATH = os.path.join('hpsearch', 'resultados.jsonl')
+
+# Espaço de busca: os valores escolhidos no notebook estão entre as opções
+DEFAULT_SPACE = {
+    'time_step': [10, 20, 40, 60],
+    'units': [25, 50, 100],
+    'dropout': [0.1, 0.2, 0.3],
+    'batch_size': [16, 32, 64],
+    'epochs': [25, 50, 100],
+}
+
+# Poda: épocas iniciais sem poda e tolerância sobre a mediana das tentativas concluídas
+PRUNE_WARMUP_EPOCHS = 5
+PRUNE_MARGIN = 0.1
+
+
+# Função para gerar as configurações da busca (grade completa ou amostra reprodutível dela)
+def sample_configs(space=None, n_trials=None, seed=42):
+    space = space or DEFAULT_SPACE
+    keys = sorted(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+    if n_trials is not None and n_trials < len(grid):
+        grid = random.Random(seed).sample(grid, n_trials)
+    return grid
+
+
+# Identificador da tentativa: configuração completa e versão dos dados
+def trial_id(config, data_version):
+    payload = json.dumps({'config': config, 'data': data_version}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+# Função para ler os registros salvos (ignora uma última linha incompleta de uma busca interrompida)
+def load_results(path=RESULTS_PATH):
+    records = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+# Função para gravar um registro assim que a tentativa termina
+def append_result(record, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Curvas de validação das tentativas concluídas, usadas como referência para a poda
+def reference_curves(records, data_version):
+    return [record['val_loss_history'] for record in records
+            if record['status'] == 'complete' and record['data_version'] == data_version]
+
+
+# Função para fixar o número de threads de cada processo do pool, antes de importar o TensorFlow
+def _init_worker(threads):
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    from train import configure_threads
+
+    configure_threads(threads, 1)
+
+
+# Callback que interrompe a tentativa quando a validação fica pior que a mediana das concluídas
+def _pruning_callback(curves, warmup=PRUNE_WARMUP_EPOCHS, margin=PRUNE_MARGIN):
+    from tensorflow.keras.callbacks import Callback
+
+    class MedianPruning(Callback):
+        def __init__(self):
+            super().__init__()
+            self.val_losses = []
+            self.pruned_at = None
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.val_losses.append(logs['val_loss'])
+            if epoch + 1 < warmup:
+                return
+            # Melhor val_loss até esta época, comparada à das tentativas que chegaram até ela
+            reached = [min(curve[:epoch + 1]) for curve in curves if len(curve) > epoch]
+            if not reached:
+                return
+            if min(self.val_losses) > np.median(reached) * (1 + margin):
+                self.pruned_at = epoch + 1
+                self.model.stop_training = True
+
+    return MedianPruning()
+
+
+# Função executada no pool: treina uma configuração e devolve o registro da tentativa
+def _run_trial(config, csv_path, curves):
+    from train import train
+
+    pruning = _pruning_callback(curves)
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        _, metrics = train(csv_path, config, checkpoint_dir=checkpoint_dir, verbose=0, callbacks=[pruning])
+    return {
+        'status': 'pruned' if pruning.pruned_at else 'complete',
+        'pruned_at': pruning.pruned_at,
+        **metrics,
+    }
+
+
+# Função para rodar a busca em paralelo, retomando a partir dos registros já salvos
+def search(csv_path='dados_petroleo.csv', space=None, n_trials=None, workers=None, results_path=RESULTS_PATH,
+           seed=42, verbose=True):
+    data_version = file_hash(csv_path)
+    configs = [{**DEFAULT_CONFIG, **config} for config in sample_configs(space, n_trials, seed)]
+    records = load_results(results_path)
+    finished = {record['trial_id'] for record in records
+                if record['status'] in ('complete', 'pruned')}
+    pending = [config for config in configs if trial_id(config, data_version) not in finished]
+    if verbose:
+        print(f'{len(configs)} tentativas, {len(configs) - len(pending)} já concluídas')
+
+    workers = max(1, min(workers or os.cpu_count(), len(pending)))
+    threads = max(1, os.cpu_count() // workers)
+
+    # 'spawn' evita herdar o estado do TensorFlow do processo pai
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        running = {}
+        queue = list(pending)
+        while queue or running:
+            # Envia as tentativas aos poucos, para que as seguintes sejam podadas com mais referências
+            while queue and len(running) < workers:
+                config = queue.pop(0)
+                curves = reference_curves(records, data_version)
+                running[pool.submit(_run_trial, config, csv_path, curves)] = config
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                config = running.pop(future)
+                record = {'trial_id': trial_id(config, data_version), 'data_version': data_version,
+                          'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+                try:
+                    record.update(future.result())
+                except Exception as error:
+                    record.update(status='failed', config=config, error=repr(error))
+                append_result(record, results_path)
+                records.append(record)
+                if verbose:
+                    print(f"{record['trial_id']} {record['status']:8} "
+                          f"val_loss={record.get('best_val_loss', float('nan')):.6f} {config}")
+
+    return best_trial(records, data_version)
+
+
+# Melhor tentativa concluída (menor val_loss) para a versão dos dados
+def best_trial(records, data_version):
+    complete = [record for record in records
+                if record['status'] == 'complete' and record['data_version'] == data_version]
+    return min(complete, key=lambda record: record['best_val_loss'], default=None)
+
+
+# Função para retreinar a melhor configuração e salvá-la como o modelo da aplicação
+def export_best(csv_path='dados_petroleo.csv', output=None, results_path=RESULTS_PATH, metrics_path=None,
+                bundle_path=None, export_numpy=True, verbose=0):
+    from bundle import BUNDLE_PATH, save_bundle
+    from train import METRICS_PATH, MODEL_PATH, load_series, save_model, train
+
+    output = output or MODEL_PATH
+    bundle_path = bundle_path or BUNDLE_PATH
+
+    best = best_trial(load_results(results_path), file_hash(csv_path))
+    if best is None:
+        raise ValueError(f'Nenhuma tentativa concluída em {results_path} para os dados atuais')
+
+    model, metrics = train(csv_path, best['config'], verbose=verbose)
+    metrics['trial_id'] = best['trial_id']
+    save_model(model, output)
+    _, scaler, _ = load_series(csv_path)
+    save_bundle(model, scaler, bundle_path, training_data=metrics['data'],
+                extra={'config': metrics['config'], 'test': metrics['test']})
+    if export_numpy:
+        from numpy_lstm import export_weights, weights_path_for
+
+        export_weights(output, weights_path_for(output))
+    with open(metrics_path or METRICS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2, ensure_ascii=False)
+    return metrics
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Busca de hiperparâmetros do LSTM, em paralelo e retomável.')
+    parser.add_argument('--data', default='dados_petroleo.csv')
+    parser.add_argument('--results', default=RESULTS_PATH, help='arquivo JSONL com os registros das tentativas')
+    parser.add_argument('--trials', type=int, help='tentativas sorteadas da grade (padrão: grade completa)')
+    parser.add_argument('--workers', type=int, help='processos em paralelo (padrão: número de CPUs)')
+    parser.add_argument('--seed', type=int, default=42, help='semente do sorteio das tentativas')
+    parser.add_argument('--space', help='JSON com o espaço de busca, ex.: \'{"time_step": [20, 60]}\'')
+    parser.add_argument('--export', metavar='ARQUIVO', help='retreina a melhor configuração e salva neste .keras')
+    parser.add_argument('--metrics', help='arquivo JSON com as métricas do modelo exportado')
+    parser.add_argument('--bundle', help='pacote do modelo exportado (padrão: lstm_bundle.npz)')
+    parser.add_argument('--no-export', action='store_true', help='não exportar os pesos para o backend NumPy')
+    args = parser.parse_args()
+
+    space = json.loads(args.space) if args.space else None
+    best = search(args.data, space, args.trials, args.workers, args.results, args.seed)
+    if best is not None:
+        print(f"Melhor tentativa: {best['trial_id']} val_loss={best['best_val_loss']:.6f}")
+        print(json.dumps(best['config'], indent=2))
+    if args.export:
+        metrics = export_best(args.data, args.export, args.results, args.metrics, args.bundle,
+                              not args.no_export)
+        print(json.dumps(metrics['test'], indent=2))
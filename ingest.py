@@ -0,0 +1,182 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Base de dados usada pela aplicação e sua cópia colunar (Arrow/Feather, lida com memory-map)
+DATA_PATH = 'dados_petroleo.csv'
+COLUMNS = ['Date', 'Close']
+
+
+# Função para obter o caminho da cópia colunar de um CSV
+def columnar_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.feather'
+
+
+class FileSource:
+    """Fonte local: um CSV com as colunas Date e Close (arquivo depositado ou fixture)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self, start_date):
+        df = pd.read_csv(self.path)
+        # Datas inválidas viram NaT e são descartadas em validate()
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        return df[dates.isna() | (dates >= pd.Timestamp(start_date))]
+
+
+class YFinanceSource:
+    """Fonte online: baixa apenas o período a partir de 'start_date' do Yahoo! Finance."""
+
+    def __init__(self, ticker='BZ=F'):
+        self.ticker = ticker
+
+    def fetch(self, start_date):
+        import yfinance as yf
+
+        df_origem = yf.download(self.ticker, start=pd.Timestamp(start_date).strftime('%Y-%m-%d'), progress=False)
+        if isinstance(df_origem.columns, pd.MultiIndex):
+            # Remover o nível de índice adicional
+            df_origem.columns = df_origem.columns.droplevel(1)
+        return df_origem.reset_index()[['Date', 'Close']]
+
+
+# Função para ler a última data do CSV sem percorrer o arquivo inteiro
+def last_stored_date(csv_path, block_size=4096):
+    with open(csv_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        position = max(end - block_size, 0)
+        f.seek(position)
+        lines = f.read().splitlines()
+    last_line = next(line for line in reversed(lines) if line.strip())
+    value = last_line.decode('utf-8').split(',')[0]
+    return pd.Timestamp(value) if value != 'Date' else None
+
+
+# Função para validar as novas linhas: datas e preços válidos, sem duplicados, em ordem
+def validate(rows, last_date=None, overrides=None):
+    rows = rows[COLUMNS].copy()
+    rows['Date'] = pd.to_datetime(rows['Date'], errors='coerce').dt.tz_localize(None).dt.normalize()
+    rows['Close'] = pd.to_numeric(rows['Close'], errors='coerce')
+
+    # Substituir valores faltantes por valores informados manualmente (ex.: dados do IPEA)
+    for day, value in (overrides or {}).items():
+        rows.loc[rows['Date'] == pd.Timestamp(day), 'Close'] = value
+
+    valid = rows['Date'].notna() & np.isfinite(rows['Close']) & (rows['Close'] > 0)
+    rows = rows[valid]
+    if last_date is not None:
+        rows = rows[rows['Date'] > last_date]
+    return rows.drop_duplicates(subset='Date', keep='last').sort_values('Date').reset_index(drop=True)
+
+
+# Função para acrescentar linhas ao final do CSV, no mesmo formato do arquivo existente
+def _append_csv(csv_path, rows):
+    with open(csv_path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+    rows.to_csv(csv_path, mode='a', header=False, index=False, date_format='%Y-%m-%d')
+
+
+# Função para ler a cópia colunar mapeada em memória
+def read_columnar(path):
+    import pyarrow.feather as feather
+
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+# Chave, nos metadados do esquema da cópia colunar, do estado do CSV a que ela corresponde
+_CSV_STATE_KEY = b'csv_state'
+
+
+# Função para registrar o estado do CSV (tamanho, mtime e última data) sem percorrer o arquivo
+def _csv_state(csv_path, last_date):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'last_date': str(last_date) if last_date is not None else None}
+
+
+# Função para conferir se a cópia colunar corresponde ao CSV no estado informado, pelos metadados
+# gravados junto com ela (o número de linhas confere a própria cópia)
+def _columnar_matches(path, csv_state):
+    import json
+
+    import pyarrow.feather as feather
+
+    if csv_state is None or not os.path.exists(path):
+        return False
+    table = feather.read_table(path, memory_map=True)
+    stored = (table.schema.metadata or {}).get(_CSV_STATE_KEY)
+    if stored is None:
+        return False
+    stored = json.loads(stored)
+    return stored.pop('rows') == table.num_rows and stored == csv_state
+
+
+# Função para atualizar a cópia colunar com as novas linhas; se ela não corresponder
+# mais ao CSV anterior ao acréscimo, é recriada a partir do CSV
+def _update_columnar(csv_path, rows, csv_state=None):
+    import json
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    path = columnar_path(csv_path)
+    if _columnar_matches(path, csv_state):
+        existing = feather.read_table(path, memory_map=True)
+        table = pa.concat_tables([existing, pa.Table.from_pandas(rows, schema=existing.schema, preserve_index=False)])
+    else:
+        df = pd.read_csv(csv_path)
+        df['Date'] = pd.to_datetime(df['Date'])
+        table = pa.Table.from_pandas(df[COLUMNS], preserve_index=False)
+
+    # Estado do CSV (após o acréscimo) a que a cópia corresponde, conferido na próxima ingestão
+    last_date = pd.Timestamp(table.column('Date')[-1].as_py()) if table.num_rows else None
+    state = {**_csv_state(csv_path, last_date), 'rows': table.num_rows}
+    metadata = {**(table.schema.metadata or {}), _CSV_STATE_KEY: json.dumps(state).encode()}
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = f'{path}.tmp'
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+# Função para incorporar apenas os dias posteriores ao último dado armazenado
+def ingest(source, csv_path=DATA_PATH, overrides=None):
+    last_date = last_stored_date(csv_path)
+    start_date = last_date + timedelta(days=1) if last_date is not None else pd.Timestamp('2019-01-01')
+
+    rows = validate(source.fetch(start_date), last_date, overrides)
+    csv_state = _csv_state(csv_path, last_date)
+    if not rows.empty:
+        _append_csv(csv_path, rows)
+    if not rows.empty or not _columnar_matches(columnar_path(csv_path), csv_state):
+        _update_columnar(csv_path, rows, csv_state)
+    return rows
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Acrescenta os novos pregões ao CSV de preços do Petróleo Brent.')
+    parser.add_argument('--data', default=DATA_PATH, help='CSV a ser atualizado')
+    parser.add_argument('--file', help='CSV local com as colunas Date e Close (sem acesso à rede)')
+    parser.add_argument('--ticker', default='BZ=F', help='ticker do Yahoo! Finance, usado quando --file não é informado')
+    parser.add_argument('--asset', help='ativo cadastrado em ativos.json (define --data e --ticker)')
+    args = parser.parse_args()
+
+    if args.asset:
+        from registry import get_asset
+
+        args.data = get_asset(args.asset).data
+        args.ticker = args.asset
+
+    source = FileSource(args.file) if args.file else YFinanceSource(args.ticker)
+    new_rows = ingest(source, args.data)
+    print(f'{len(new_rows)} novas linhas incorporadas a {args.data}')
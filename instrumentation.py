@@ -0,0 +1,159 @@
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Instrumentação ligada por variável de ambiente (PREVISAO_METRICS=1); desligada, o custo é quase nulo
+_enabled = os.environ.get('PREVISAO_METRICS') == '1'
+
+# Arquivo de saída do cProfile (PREVISAO_PROFILE=caminho.prof); vazio desativa o perfil
+PROFILE_PATH = os.environ.get('PREVISAO_PROFILE', '')
+
+_lock = threading.Lock()
+_timings = {}  # nome -> [contagem, total, máximo, último] (segundos)
+_counters = {}
+_info = {}
+
+
+def enabled():
+    return _enabled
+
+
+def enable(value=True):
+    global _enabled
+    _enabled = value
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+        _info.clear()
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            stats = _timings.get(self.name)
+            if stats is None:
+                _timings[self.name] = [1, elapsed, elapsed, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = max(stats[2], elapsed)
+                stats[3] = elapsed
+        return False
+
+
+# Mede o tempo de uma etapa: "with span('csv_parse'): ..."
+def span(name):
+    if not _enabled:
+        return _NOOP
+    return _Span(name)
+
+
+# Incrementa um contador (ex.: passos de previsão, acertos do cache)
+def increment(name, value=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+# Registra uma informação descritiva (ex.: versão do modelo em uso)
+def set_info(name, value):
+    if not _enabled:
+        return
+    with _lock:
+        _info[name] = value
+
+
+# Retrato atual das métricas, incluindo as estatísticas do cache de recursos
+def snapshot():
+    from resources import cache_stats
+
+    with _lock:
+        timings = {
+            name: {'count': count, 'total_seconds': total, 'max_seconds': peak, 'last_seconds': last,
+                   'mean_seconds': total / count}
+            for name, (count, total, peak, last) in _timings.items()
+        }
+        counters = dict(_counters)
+        info = dict(_info)
+    return {'enabled': _enabled, 'timings': timings, 'counters': counters, 'info': info, 'cache': cache_stats()}
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2, default=str)
+
+
+# Métricas no formato texto do Prometheus
+def to_prometheus(prefix='previsao'):
+    data = snapshot()
+    lines = [
+        f'# TYPE {prefix}_stage_seconds summary',
+    ]
+    for name, stats in data['timings'].items():
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["total_seconds"]}')
+    lines.append(f'# TYPE {prefix}_stage_seconds_max gauge')
+    for name, stats in data['timings'].items():
+        lines.append(f'{prefix}_stage_seconds_max{{stage="{name}"}} {stats["max_seconds"]}')
+
+    lines.append(f'# TYPE {prefix}_events_total counter')
+    for name, value in data['counters'].items():
+        lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+
+    lines.append(f'# TYPE {prefix}_resource_hits_total counter')
+    lines.append(f'# TYPE {prefix}_resource_loads_total counter')
+    for stats in data['cache']:
+        lines.append(f'{prefix}_resource_hits_total{{resource="{stats["name"]}"}} {stats["hits"]}')
+        lines.append(f'{prefix}_resource_loads_total{{resource="{stats["name"]}"}} {stats["loads"]}')
+
+    if data['info']:
+        # Nomes de rótulos aceitam apenas [a-zA-Z0-9_]
+        labels = ','.join(f'{re.sub(r"[^a-zA-Z0-9_]", "_", key)}="{value}"'
+                          for key, value in sorted(data['info'].items()))
+        lines.append(f'# TYPE {prefix}_info gauge')
+        lines.append(f'{prefix}_info{{{labels}}} 1')
+    return '\n'.join(lines) + '\n'
+
+
+# Executa o bloco sob o cProfile e grava as estatísticas, se PREVISAO_PROFILE estiver definido
+@contextmanager
+def profiled(path=None):
+    path = path or PROFILE_PATH
+    if not path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
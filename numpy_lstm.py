@@ -0,0 +1,199 @@
+import json
+import os
+
+import numpy as np
+
+# Arquivo compacto com os pesos exportados do modelo Keras
+WEIGHTS_PATH = 'lstm_weights.npz'
+
+# Modelo Keras do Petróleo Brent, cujos pesos exportados ficam em WEIGHTS_PATH
+_DEFAULT_MODEL_PATH = 'lstm_model.keras'
+
+# Camadas suportadas pela execução em NumPy
+SUPPORTED_LAYERS = ('LSTM', 'Dropout', 'Dense')
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+_ACTIVATIONS = {
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+}
+
+
+# Função para extrair a arquitetura e os pesos de um modelo Keras sequencial
+def model_arrays(model):
+    layers = []
+    arrays = {}
+    for i, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        if kind not in SUPPORTED_LAYERS:
+            raise ValueError(f'Camada não suportada na exportação: {kind}')
+
+        config = {'type': kind}
+        if kind == 'LSTM':
+            config.update(units=layer.units, return_sequences=layer.return_sequences,
+                          activation=layer.activation.__name__,
+                          recurrent_activation=layer.recurrent_activation.__name__)
+        elif kind == 'Dense':
+            config.update(units=layer.units, activation=layer.activation.__name__)
+        elif kind == 'Dropout':
+            config.update(rate=float(layer.rate))
+        layers.append(config)
+
+        for j, weight in enumerate(layer.get_weights()):
+            arrays[f'layer{i}_w{j}'] = weight.astype(np.float32)
+
+    architecture = {'layers': layers, 'input_shape': list(model.input_shape[1:])}
+    return architecture, arrays
+
+
+# Função para obter o arquivo de pesos exportados de um modelo: o do Petróleo Brent mantém WEIGHTS_PATH;
+# os demais usam o mesmo nome com extensão .npz, como no cadastro de ativos (registry.load_registry)
+def weights_path_for(model_path):
+    if os.path.normpath(model_path) == _DEFAULT_MODEL_PATH:
+        return WEIGHTS_PATH
+    return f'{os.path.splitext(model_path)[0]}.npz'
+
+
+# Função para exportar os pesos de um modelo Keras sequencial para um arquivo .npz
+def export_weights(model_path, weights_path=WEIGHTS_PATH):
+    from tensorflow.keras.models import load_model
+
+    architecture, arrays = model_arrays(load_model(model_path))
+    np.savez(weights_path, architecture=json.dumps(architecture), **arrays)
+    return weights_path
+
+
+# Função para ler a arquitetura e os pesos (por camada) de um arquivo .npz já aberto
+def read_arrays(artifact):
+    architecture = json.loads(str(artifact['architecture']))
+    weights = []
+    for i in range(len(architecture['layers'])):
+        layer_weights = []
+        while f'layer{i}_w{len(layer_weights)}' in artifact:
+            layer_weights.append(artifact[f'layer{i}_w{len(layer_weights)}'])
+        weights.append(layer_weights)
+    return architecture, weights
+
+
+class NumpyLSTM:
+    """Execução do modelo LSTM exportado usando apenas NumPy.
+
+    Oferece a mesma interface usada pela aplicação (predict e chamada direta
+    com 'training'), sem precisar carregar o TensorFlow.
+    """
+
+    def __init__(self, layers, weights, input_shape=None, seed=None):
+        self.layers = layers
+        self.weights = weights
+        self.input_shape = (None, *input_shape) if input_shape is not None else None
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def load(cls, weights_path=WEIGHTS_PATH, seed=None):
+        with np.load(weights_path) as artifact:
+            architecture, weights = read_arrays(artifact)
+        return cls(architecture['layers'], weights, architecture.get('input_shape'), seed=seed)
+
+    # Passo recorrente de uma camada LSTM (ordem dos portões no Keras: entrada, esquecimento, célula, saída)
+    def _lstm(self, x, config, kernel, recurrent_kernel, bias):
+        units = config['units']
+        activation = _ACTIVATIONS[config['activation']]
+        recurrent_activation = _ACTIVATIONS[config['recurrent_activation']]
+
+        batch, time_steps, _ = x.shape
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+
+        # A projeção das entradas não depende do estado: calculada para todos os passos de uma vez
+        projected = x @ kernel + bias
+        outputs = np.empty((batch, time_steps, units), dtype=np.float32) if config['return_sequences'] else None
+
+        for t in range(time_steps):
+            z = projected[:, t, :] + h @ recurrent_kernel
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            if outputs is not None:
+                outputs[:, t, :] = h
+
+        return outputs if outputs is not None else h
+
+    def __call__(self, x, training=False):
+        x = np.asarray(x, dtype=np.float32)
+        for config, weights in zip(self.layers, self.weights):
+            kind = config['type']
+            if kind == 'LSTM':
+                x = self._lstm(x, config, *weights)
+            elif kind == 'Dense':
+                x = _ACTIVATIONS[config['activation']](x @ weights[0] + weights[1])
+            elif kind == 'Dropout' and training:
+                # Dropout ativo apenas em modo de treino (usado pelo Monte Carlo Dropout)
+                keep = 1.0 - config['rate']
+                x = x * (self._rng.random(x.shape) < keep) / keep
+        return x.astype(np.float32)
+
+    def predict(self, x, verbose=0):
+        return self(x, training=False)
+
+    # Função para prever 'steps' passos à frente de forma autorregressiva para N janelas (N, janela, 1)
+    def forecast(self, windows, steps, mc_dropout=False):
+        windows = np.asarray(windows, dtype=np.float32)
+        predictions = np.empty((windows.shape[0], steps), dtype=np.float32)
+        for step in range(steps):
+            prediction = self(windows, training=mc_dropout)
+            predictions[:, step] = prediction[:, 0]
+            # Desliza a janela e adiciona a previsão ao final da sequência
+            windows = np.concatenate([windows[:, 1:, :], prediction[:, np.newaxis, :]], axis=1)
+        return predictions
+
+
+# Função para comparar as saídas do NumPy com as do Keras sobre janelas aleatórias
+def check_parity(model_path, weights_path=WEIGHTS_PATH, num_days=60, samples=64, steps=15, seed=42):
+    from tensorflow.keras.models import load_model
+
+    keras_model = load_model(model_path)
+    numpy_model = NumpyLSTM.load(weights_path)
+
+    rng = np.random.default_rng(seed)
+    windows = rng.random((samples, num_days, 1), dtype=np.float32)
+
+    one_step = np.max(np.abs(keras_model(windows, training=False).numpy() - numpy_model(windows)))
+
+    # O horizonte recursivo acumula as diferenças de arredondamento ao longo dos passos
+    keras_windows = windows.copy()
+    keras_predictions = []
+    for _ in range(steps):
+        prediction = keras_model(keras_windows, training=False).numpy()
+        keras_predictions.append(prediction[:, 0])
+        keras_windows = np.concatenate([keras_windows[:, 1:, :], prediction[:, np.newaxis, :]], axis=1)
+    horizon = np.max(np.abs(np.stack(keras_predictions, axis=1) - numpy_model.forecast(windows, steps)))
+
+    return {'one_step_max_abs_diff': float(one_step), 'horizon_max_abs_diff': float(horizon)}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Exporta o modelo LSTM para NumPy e verifica a paridade com o Keras.')
+    parser.add_argument('command', choices=['export', 'check'])
+    parser.add_argument('--model', default='lstm_model.keras', help='modelo Keras de origem')
+    parser.add_argument('--weights', default=WEIGHTS_PATH, help='arquivo de pesos exportado')
+    parser.add_argument('--atol', type=float, default=1e-5, help='tolerância máxima aceita na verificação')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        print(f'Pesos exportados para {export_weights(args.model, args.weights)}')
+    else:
+        result = check_parity(args.model, args.weights)
+        print(json.dumps(result, indent=2))
+        if max(result.values()) > args.atol:
+            raise SystemExit(f'Diferença acima da tolerância ({args.atol})')
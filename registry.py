@@ -0,0 +1,99 @@
+import json
+import os
+import re
+from collections import namedtuple
+
+from forecasting import NUM_DAYS
+from resources import (BUNDLE_PATH, DATA_PATH, MODEL_PATH, WEIGHTS_PATH, get_bundle_info, get_data,
+                       get_data_scaler, get_model, model_cache, serving_model_path)
+
+# Arquivo com o cadastro dos ativos atendidos pela aplicação
+REGISTRY_PATH = 'ativos.json'
+
+# Ativo original do projeto (Petróleo Brent)
+DEFAULT_ASSET = 'BZ=F'
+
+# Artefatos de um ativo: pacote do modelo (rede, scaler e janela do treino), modelo Keras,
+# pesos exportados para o backend NumPy e CSV de preços
+Asset = namedtuple('Asset', ['ticker', 'name', 'bundle', 'model', 'weights', 'data'])
+
+# O que a previsão de um ativo usa: arquivo do modelo, scaler e janela de dias históricos
+Serving = namedtuple('Serving', ['model_path', 'scaler', 'window'])
+
+_DEFAULT_REGISTRY = {
+    DEFAULT_ASSET: {'name': 'Petróleo Brent', 'bundle': BUNDLE_PATH, 'model': MODEL_PATH, 'weights': WEIGHTS_PATH,
+                    'data': DATA_PATH},
+}
+
+
+# Função para ler o cadastro de ativos (sem o arquivo, apenas o Petróleo Brent)
+def load_registry(path=REGISTRY_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        entries = _DEFAULT_REGISTRY
+
+    registry = {}
+    for ticker, entry in entries.items():
+        model = entry['model']
+        weights = entry.get('weights') or f'{os.path.splitext(model)[0]}.npz'
+        registry[ticker] = Asset(ticker, entry.get('name', ticker), entry.get('bundle'), model, weights,
+                                 entry['data'])
+    return registry
+
+
+_registry = load_registry()
+
+
+def assets():
+    return list(_registry.values())
+
+
+def get_asset(ticker=None):
+    ticker = ticker or DEFAULT_ASSET
+    try:
+        return _registry[ticker]
+    except KeyError:
+        raise ValueError(f'Ativo não cadastrado: {ticker}') from None
+
+
+# Arquivo do modelo usado para o ativo: o pacote, se existir; senão conforme o backend de inferência
+def model_path(asset):
+    return serving_model_path(asset.bundle, asset.model, asset.weights)
+
+
+# Nomes dos recursos nas métricas: o ativo padrão mantém os nomes originais. Os demais levam o ticker
+# com apenas [a-zA-Z0-9_], pois os nomes viram nomes de rótulos no Prometheus (ex.: 'BRL=X' -> 'BRL_X')
+def _resource_name(asset, kind):
+    return kind if asset.ticker == DEFAULT_ASSET else f"{kind}_{re.sub(r'[^a-zA-Z0-9_]', '_', asset.ticker)}"
+
+
+# Modelo do ativo, carregado sob demanda pelo cache LRU
+def get_asset_model(ticker=None):
+    asset = get_asset(ticker)
+    return get_model(model_path(asset), _resource_name(asset, 'model'))
+
+
+# Dados históricos do ativo
+def get_asset_data(ticker=None):
+    asset = get_asset(ticker)
+    return get_data(asset.data, _resource_name(asset, 'data'))
+
+
+# Scaler e janela do treino, lidos do pacote do modelo (sem carregar a rede)
+def get_asset_serving(ticker=None):
+    asset = get_asset(ticker)
+    path = model_path(asset)
+    if path == asset.bundle:
+        info = get_bundle_info(path, _resource_name(asset, 'bundle_info'))
+        return Serving(path, info.scaler, info.window)
+
+    # Modelo sem pacote: scaler ajustado sobre o CSV do ativo (uma vez por versão dos dados)
+    # e janela padrão da aplicação
+    return Serving(path, get_data_scaler(asset.data, _resource_name(asset, 'data')), NUM_DAYS)
+
+
+# Registra os recursos de modelo com os nomes de cada ativo, sem carregá-los
+for _asset in _registry.values():
+    model_cache.resource(model_path(_asset), _resource_name(_asset, 'model'))
@@ -0,0 +1,335 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from bundle import BUNDLE_PATH, ModelBundle, is_bundle, load_bundle, read_info
+from instrumentation import increment, set_info, span
+from numpy_lstm import WEIGHTS_PATH, NumpyLSTM
+
+# Caminhos padrão dos artefatos usados pela aplicação
+MODEL_PATH = 'lstm_model.keras'
+DATA_PATH = 'dados_petroleo.csv'
+
+# Backend de inferência: 'keras' (TensorFlow) ou 'numpy' (pesos exportados, sem TensorFlow)
+MODEL_BACKEND = os.environ.get('PREVISAO_BACKEND', 'keras')
+
+# Memória máxima ocupada pelos modelos carregados (PREVISAO_MODEL_BUDGET_MB); os menos usados saem primeiro
+MODEL_MEMORY_BUDGET = int(os.environ.get('PREVISAO_MODEL_BUDGET_MB', '1024')) * 2 ** 20
+
+# Custo fixo estimado de um modelo Keras em memória, além dos pesos (objetos, grafo compilado)
+KERAS_MODEL_OVERHEAD = 32 * 2 ** 20
+
+# Função para obter uma assinatura barata do arquivo (sem ler o conteúdo)
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# Função para calcular o hash do conteúdo do arquivo
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Hashes já calculados, indexados pela assinatura do arquivo
+_versions = {}
+
+
+# Função para obter a versão (hash do conteúdo) de um arquivo, recalculada só quando ele muda
+def file_version(path):
+    signature = _file_signature(path)
+    cached = _versions.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    content_hash = file_hash(path)
+    _versions[path] = (signature, content_hash)
+    return content_hash
+
+
+class CachedResource:
+    """Recurso carregado uma única vez por processo e compartilhado entre sessões.
+
+    O recurso é recarregado apenas quando o arquivo de origem muda em disco:
+    a verificação rápida usa mtime/tamanho e, se houver diferença, o hash do
+    conteúdo decide se é preciso recarregar. A troca da versão é atômica
+    (uma única atribuição), então leitores concorrentes sempre veem uma
+    versão completa.
+    """
+
+    def __init__(self, name, path, loader):
+        self.name = name
+        self.path = path
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._entry = None  # (assinatura, hash, valor)
+        self.hits = 0
+        self.loads = 0
+        self.last_load_seconds = None
+        self.total_load_seconds = 0.0
+
+    @property
+    def version(self):
+        entry = self._entry
+        return entry[1] if entry is not None else None
+
+    def get(self):
+        signature = _file_signature(self.path)
+        entry = self._entry
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            increment(f'{self.name}_cache_hit')
+            return entry[2]
+
+        with self._lock:
+            # Outra thread pode ter carregado enquanto esperávamos o lock
+            entry = self._entry
+            signature = _file_signature(self.path)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[2]
+
+            content_hash = file_version(self.path)
+            if entry is not None and entry[1] == content_hash:
+                # Arquivo apenas "tocado": conteúdo idêntico, não recarrega
+                self._entry = (signature, content_hash, entry[2])
+                self.hits += 1
+                return entry[2]
+
+            start = time.perf_counter()
+            with span(f'{self.name}_load'):
+                value = self.loader(self.path)
+            elapsed = time.perf_counter() - start
+            increment(f'{self.name}_cache_miss')
+            set_info(f'{self.name}_version', content_hash[:16])
+
+            self._entry = (signature, content_hash, value)
+            self.loads += 1
+            self.last_load_seconds = elapsed
+            self.total_load_seconds += elapsed
+            return value
+
+    # Descarta o valor carregado (a próxima chamada a get() recarrega do disco)
+    def unload(self):
+        with self._lock:
+            self._entry = None
+
+    @property
+    def loaded(self):
+        return self._entry is not None
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'path': self.path,
+            'version': self.version,
+            'hits': self.hits,
+            'loads': self.loads,
+            'last_load_seconds': self.last_load_seconds,
+            'total_load_seconds': self.total_load_seconds,
+        }
+
+
+# Função para carregar o modelo LSTM salvo (TensorFlow só é importado aqui, sob demanda)
+def _load_model(path):
+    from tensorflow.keras.models import load_model
+
+    return load_model(path)
+
+
+# Função para carregar os pesos exportados para execução em NumPy
+def _load_numpy_model(path):
+    return NumpyLSTM.load(path)
+
+
+# Função para carregar o pacote do modelo (rede, scaler e janela) em uma única leitura
+def _load_bundle(path):
+    return load_bundle(path, MODEL_BACKEND)
+
+
+# Função para carregar os dados do CSV
+def _load_data(path):
+    from ingest import columnar_path, read_columnar
+
+    # Usar a cópia colunar mapeada em memória quando ela estiver em dia com o CSV
+    columnar = columnar_path(path)
+    if os.path.exists(columnar) and os.stat(columnar).st_mtime_ns >= os.stat(path).st_mtime_ns:
+        with span('columnar_read'):
+            df_close = read_columnar(columnar)
+    else:
+        with span('csv_parse'):
+            df_close = pd.read_csv(path)
+
+        # Converter a coluna de data para datetime
+        with span('date_conversion'):
+            df_close['Date'] = pd.to_datetime(df_close['Date'])
+    return df_close
+
+
+# Função para ajustar o scaler sobre o CSV (apenas para modelos sem pacote, que não guardam o do treino)
+def fit_scaler(df):
+    from sklearn.preprocessing import MinMaxScaler
+
+    with span('scaler_fit'):
+        return MinMaxScaler(feature_range=(0, 1)).fit(df[['Close']].to_numpy())
+
+
+# Função para escolher o carregador pelo tipo do arquivo: pacote, pesos exportados (.npz) ou modelo Keras
+def _model_loader(path):
+    if is_bundle(path):
+        return _load_bundle
+    return _load_numpy_model if path.endswith('.npz') else _load_model
+
+
+# Função para estimar a memória ocupada por um modelo carregado
+def model_nbytes(model):
+    if isinstance(model, ModelBundle):
+        model = model.model
+    if isinstance(model, NumpyLSTM):
+        return sum(w.nbytes for layer_weights in model.weights for w in layer_weights)
+    weights = sum(int(np.prod(w.shape)) * np.dtype(w.dtype).itemsize for w in model.weights)
+    return weights + KERAS_MODEL_OVERHEAD
+
+
+class ModelCache:
+    """Modelos carregados sob demanda, com descarte LRU dentro de um orçamento de memória.
+
+    Cada modelo é um CachedResource (recarregado quando o arquivo muda). Ao
+    passar do orçamento, os modelos usados há mais tempo são descartados; o
+    modelo recém-pedido é sempre mantido, mesmo que sozinho passe do limite.
+    """
+
+    def __init__(self, budget=MODEL_MEMORY_BUDGET):
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._resources = OrderedDict()  # caminho -> CachedResource, do menos para o mais usado
+        self._sizes = {}  # caminho -> bytes estimados
+        self.evictions = 0
+
+    # Recurso associado ao arquivo do modelo (criado na primeira vez, sem carregar)
+    def resource(self, path, name='model'):
+        with self._lock:
+            resource = self._resources.get(path)
+            if resource is None:
+                resource = self._resources[path] = CachedResource(name, path, _model_loader(path))
+            return resource
+
+    def get(self, path, name='model'):
+        resource = self.resource(path, name)
+        model = resource.get()
+        with self._lock:
+            self._resources.move_to_end(path)
+            self._sizes[path] = model_nbytes(model)
+            self._evict(keep=path)
+        return model
+
+    def _evict(self, keep):
+        for path, resource in list(self._resources.items()):
+            if self.memory_bytes() <= self.budget:
+                break
+            if path == keep or not resource.loaded:
+                continue
+            resource.unload()
+            self._sizes.pop(path, None)
+            self.evictions += 1
+            increment('model_cache_eviction')
+
+    def memory_bytes(self):
+        return sum(self._sizes.values())
+
+    def stats(self):
+        return {
+            'budget_bytes': self.budget,
+            'memory_bytes': self.memory_bytes(),
+            'evictions': self.evictions,
+            'loaded': [path for path, resource in self._resources.items() if resource.loaded],
+        }
+
+
+# Arquivo do modelo servido: o pacote, quando existe; senão o modelo Keras ou os pesos exportados
+def serving_model_path(bundle_path=BUNDLE_PATH, model_path=MODEL_PATH, weights_path=WEIGHTS_PATH):
+    if bundle_path and os.path.exists(bundle_path):
+        return bundle_path
+    return weights_path if MODEL_BACKEND == 'numpy' else model_path
+
+
+# Recursos compartilhados por todas as sessões do processo
+model_cache = ModelCache()
+model_resource = model_cache.resource(serving_model_path())
+data_resource = CachedResource('data', DATA_PATH, _load_data)
+
+# Dados de outros ativos e metadados dos pacotes, indexados pelo caminho (pequenos, não entram no orçamento)
+_data_resources = {DATA_PATH: data_resource}
+_info_resources = {}
+_data_scalers = {}  # CSV -> (DataFrame carregado, scaler ajustado sobre ele)
+_data_lock = threading.Lock()
+
+
+# Função para obter um modelo (por padrão, o do Petróleo Brent) pelo cache LRU
+def get_model(path=None, name='model'):
+    model = model_cache.get(path or model_resource.path, name)
+    return model.model if isinstance(model, ModelBundle) else model
+
+
+# Função para obter o scaler e a janela do pacote, sem carregar a rede
+def get_bundle_info(path=None, name='bundle_info'):
+    path = path or model_resource.path
+    with _data_lock:
+        resource = _info_resources.get(path)
+        if resource is None:
+            resource = _info_resources[path] = CachedResource(name, path, read_info)
+    return resource.get()
+
+
+# Função para obter os dados de um CSV (por padrão, o do Petróleo Brent)
+def get_data(path=None, name='data'):
+    path = path or DATA_PATH
+    with _data_lock:
+        resource = _data_resources.get(path)
+        if resource is None:
+            resource = _data_resources[path] = CachedResource(name, path, _load_data)
+    return resource.get()
+
+
+# Função para obter o scaler ajustado sobre um CSV, reajustado apenas quando os dados mudam
+def get_data_scaler(path=None, name='data'):
+    path = path or DATA_PATH
+    df = get_data(path, name)
+    with _data_lock:
+        # O DataFrame só é substituído quando o CSV muda de versão
+        cached = _data_scalers.get(path)
+        if cached is None or cached[0] is not df:
+            cached = _data_scalers[path] = (df, fit_scaler(df))
+    return cached[1]
+
+
+_warm_up_thread = None
+
+
+# Função para pré-carregar modelo e dados em segundo plano, sem bloquear a página atual
+def start_warm_up():
+    global _warm_up_thread
+    if _warm_up_thread is None:
+        def warm_up():
+            get_data()
+            get_model()
+
+        _warm_up_thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+        _warm_up_thread.start()
+    return _warm_up_thread
+
+
+# Estatísticas de carregamento e uso do cache
+def cache_stats():
+    with model_cache._lock:
+        models = list(model_cache._resources.values())
+    with _data_lock:
+        data = list(_data_resources.values()) + list(_info_resources.values())
+    return [resource.stats() for resource in models + data]
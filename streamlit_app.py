@@ -1,74 +1,27 @@
+import os
 import streamlit as st
 from datetime import date, timedelta
-import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from tensorflow.keras.models import load_model
-from sklearn.preprocessing import MinMaxScaler
+
+# Dependências pesadas (TensorFlow, scikit-learn e Plotly) são importadas sob demanda,
+# apenas na seção de previsão, para que as páginas de texto abram instantaneamente
+from forecasting import FORECAST_ENGINE, MAX_FORECAST_DAYS, NUM_DAYS
+from instrumentation import enabled as metrics_enabled, profiled, snapshot, span
+from resources import data_resource, get_data, start_warm_up
 
 # Configurar título e ícone da página
 st.set_page_config(page_title="Previsão do Preço do Petróleo Brent", page_icon="🛢️")
 
-# Carregar o modelo LSTM salvo
-model = load_model('lstm_model.keras')
-
-# Carregar os dados do CSV para ajustar o scaler
-df_close = pd.read_csv('dados_petroleo.csv')
-
-# Converter a coluna de data para datetime
-df_close['Date'] = pd.to_datetime(df_close['Date'])
-
-scaler = MinMaxScaler(feature_range=(0, 1))
-scaler.fit(df_close[['Close']])
-
-# Defina o número de dias históricos a serem usados para a previsão
-NUM_DAYS = 60  # Ajuste conforme necessário
-
-# Limite o horizonte de previsão
-MAX_FORECAST_DAYS = 15  # Limite de 15 dias para previsão
-
-# Calcular a data máxima permitida para previsão
-last_date = df_close['Date'].max()
-max_forecast_date = last_date + timedelta(days=MAX_FORECAST_DAYS)
-
-# Função para verificar se uma data é um dia útil
-def is_weekday(date):
-    return date.weekday() < 5  # 0 é segunda-feira, 4 é sexta-feira
-
-# Função para gerar previsões a partir de um número configurável de dias até a data selecionada
-def generate_predictions(df, model, scaler, end_date, num_days):
-    predictions = []
-    
-    # Prepare uma sequência de dados para prever
-    last_days = df[['Close']].values[-num_days:]  # Pega os últimos 'num_days' dias
-    last_days_scaled = scaler.transform(last_days)
-    
-    # Converter end_date para Timestamp
-    end_date = pd.Timestamp(end_date)
-    
-    current_date = df['Date'].max() + timedelta(days=1)
-    
-    while current_date <= end_date:
-        if is_weekday(current_date):
-            # Adicionar a previsão ao final da sequência
-            date_array_scaled = np.array([last_days_scaled])
-            
-            # Fazer a previsão
-            prediction_scaled = model.predict(date_array_scaled)
-            
-            # Reverter a normalização
-            prediction = scaler.inverse_transform(
-                np.concatenate((prediction_scaled, np.zeros((prediction_scaled.shape[0], df.shape[1] - 1))), axis=1)
-            )[:, 0]
-            
-            predictions.append((current_date, prediction[0]))
-            
-            # Atualizar a sequência de dados para a próxima previsão
-            last_days_scaled = np.append(last_days_scaled[1:], prediction_scaled, axis=0)
-        
-        current_date += timedelta(days=1)
-    
-    return predictions
+# Pré-carregamento opcional do modelo e dos dados em segundo plano (PREVISAO_WARMUP=1)
+if os.environ.get('PREVISAO_WARMUP') == '1':
+    start_warm_up()
+
+# Número de amostras de Monte Carlo Dropout para a faixa de incerteza
+MC_SAMPLES = 100
+
+# Função para formatar números no padrão brasileiro (vírgula como separador decimal)
+def format_br(value, decimals=2):
+    return f"{value:.{decimals}f}".replace('.', ',')
 
 # Configuração do menu lateral
 st.sidebar.title("Navegação")
@@ -101,6 +54,23 @@ if menu == "Home":
     """)
 
 elif menu == "Análise Exploratória dos Dados":
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    from eda import ROLLING_WINDOWS, engine as eda_engine
+
+    # Estatísticas calculadas a partir dos dados atuais e mantidas em cache por versão dos dados
+    df_close = get_data()
+    data_version = data_resource.version
+    descriptive = eda_engine.describe(df_close, data_version)
+    tests, decomposition = eda_engine.expensive(df_close, data_version)
+
+    # Conclusão do teste ADF conforme o p-valor atual, com nível de significância de 5%
+    if tests['adf_pvalue'] > 0.05:
+        adf_conclusion = "Este valor é maior do que o nível de significância escolhido, o que significa que não se rejeita a hipótese nula. Com um alto grau de confiança, conclui-se que a série apresenta uma raiz unitária e não é estacionária."
+    else:
+        adf_conclusion = "Este valor é menor do que o nível de significância escolhido, o que significa que se rejeita a hipótese nula. Conclui-se que a série não apresenta uma raiz unitária e é estacionária."
+
     st.title("Análise Exploratória dos Dados")
     
     st.subheader("Coleta e Avaliação dos Dados")
@@ -143,49 +113,62 @@ elif menu == "Análise Exploratória dos Dados":
     
     **Gráfico 1 - Série Temporal do Preço de Fechamento do Petróleo Brent**
     """)
-    # Indicação para imagem: Adicione a imagem do Gráfico 1 aqui
-    st.image("imagens/grafico_01_seria_temporal_preco_petroleo.png", caption="Gráfico 1 - Série Temporal do Preço de Fechamento do Petróleo Brent")
-
-    st.write("""
-    Em resumo, as medidas descritivas (Tabela 1) mostram que o preço médio do Petróleo Brent é de 73,15 dólares por barril, com valores mínimo e máximo de 19,33 e 127,98 dólares, respectivamente.
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df_close['Date'], y=df_close['Close'], mode='lines',
+                             name='Preço de Fechamento', line=dict(color='darkblue')))
+    for window in ROLLING_WINDOWS:
+        rolling_mean, _ = eda_engine.rolling(df_close, data_version, window)
+        fig.add_trace(go.Scatter(x=df_close['Date'].iloc[window - 1:], y=rolling_mean, mode='lines',
+                                 name=f'Média Móvel ({window} dias)'))
+    fig.update_layout(xaxis_title='', yaxis_title='Preço de Fechamento', legend=dict(x=0, y=1), hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.write(f"""
+    Em resumo, as medidas descritivas (Tabela 1) mostram que o preço médio do Petróleo Brent é de {format_br(descriptive['Média'])} dólares por barril, com valores mínimo e máximo de {format_br(descriptive['Mínimo'])} e {format_br(descriptive['Máximo'])} dólares, respectivamente.
     
     **Tabela 1 - Medidas descritivas para a série de preços do Petróleo Brent**
     """)
-    # Exemplo de tabela em Streamlit
-    data = {
-        "Volume de Dados": [1491],
-        "Média": [73.15],
-        "Desvio Padrão": [19.12],
-        "Mínimo": [19.33],
-        "Quartil 1": [62.37],
-        "Mediana": [74.51],
-        "Quartil 3": [84.61],
-        "Máximo": [127.98],
-        "Coeficiente de Variação": ["26.1%"]
-    }
+    # Tabela calculada a partir dos dados atuais
+    data = {name: [round(value, 2)] for name, value in descriptive.items()}
+    data["Volume de Dados"] = [descriptive["Volume de Dados"]]
+    data["Coeficiente de Variação"] = [f"{descriptive['Coeficiente de Variação']:.1f}%"]
     st.table(pd.DataFrame(data))
 
-    st.write("""
-    A dispersão dos dados pode ser considerada moderada se estiver abaixo de 15%, média entre 15% e 30% e alta acima de 30%. Para os dados de preços do Petróleo Brent, a variação é de 26,1%, indicando uma dispersão média dos dados em torno da média. Além disso, um desvio padrão superior indicaria uma maior volatilidade, com oscilações de preços mais acentuadas. Pelas análises descritivas realizadas, percebe-se uma certa variabilidade nos dados, sendo o desvio padrão de 19,12 dólares.
+    st.write(f"""
+    A dispersão dos dados pode ser considerada moderada se estiver abaixo de 15%, média entre 15% e 30% e alta acima de 30%. Para os dados de preços do Petróleo Brent, a variação é de {format_br(descriptive['Coeficiente de Variação'], 1)}%, indicando uma dispersão média dos dados em torno da média. Além disso, um desvio padrão superior indicaria uma maior volatilidade, com oscilações de preços mais acentuadas. Pelas análises descritivas realizadas, percebe-se uma certa variabilidade nos dados, sendo o desvio padrão de {format_br(descriptive['Desvio Padrão'])} dólares.
     
-    Por meio da combinação do histograma com a curva de densidade (Gráfico 2), é possível visualizar o comportamento dos preços de fechamento do Petróleo Brent. A distribuição apresenta uma forma relativamente normal, o que reafirma visualmente uma certa estabilidade ao longo do período analisado, com variações em torno de um valor médio de 73,15 dólares. A discreta assimetria à direita, observada tanto no histograma quanto no boxplot, pode indicar uma possível tendência de alta a longo prazo.
+    Por meio da combinação do histograma com a curva de densidade (Gráfico 2), é possível visualizar o comportamento dos preços de fechamento do Petróleo Brent. A distribuição apresenta uma forma relativamente normal, o que reafirma visualmente uma certa estabilidade ao longo do período analisado, com variações em torno de um valor médio de {format_br(descriptive['Média'])} dólares. A discreta assimetria à direita, observada tanto no histograma quanto no boxplot, pode indicar uma possível tendência de alta a longo prazo.
     
     **Gráfico 2 - Boxplot e Histograma da série do Preço de Fechamento do Petróleo Brent**
     """)
-    # Indicação para imagem: Adicione a imagem do Gráfico 2 aqui
-    st.image("imagens/grafico_02_box_plot_histograma_preco_petroleo.png", caption="Gráfico 2 - Boxplot e Histograma da série do Preço de Fechamento do Petróleo Brent")
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Boxplot', 'Histograma'))
+    fig.add_trace(go.Box(x=df_close['Close'], name='', marker_color='#8fbf6f', boxpoints='outliers'), row=1, col=1)
+    fig.add_trace(go.Histogram(x=df_close['Close'], nbinsx=30, marker_color='#a1c9f4'), row=1, col=2)
+    fig.update_xaxes(title_text='Preço de Fechamento')
+    fig.update_yaxes(title_text='Frequência', row=1, col=2)
+    fig.update_layout(showlegend=False)
+    st.plotly_chart(fig, use_container_width=True)
 
-    st.write("""
-    Em relação aos outliers, a análise dos dados revela a presença de valores atípicos significativos. No histograma, os outliers são valores discrepantes que se destacam significativamente em relação aos demais e costumam ser identificados como pontos soltos no gráfico. O mesmo comportamento é observado no boxplot, onde há evidências de pontos isolados além das linhas do gráfico de caixa. Especificamente, os preços mínimos de 19,33 dólares e máximos de 127,98 dólares são considerados outliers, indicando a presença de valores discrepantes no fechamento do Petróleo Brent para o período em estudo.
+    st.write(f"""
+    Em relação aos outliers, a análise dos dados revela a presença de valores atípicos significativos. No histograma, os outliers são valores discrepantes que se destacam significativamente em relação aos demais e costumam ser identificados como pontos soltos no gráfico. O mesmo comportamento é observado no boxplot, onde há evidências de pontos isolados além das linhas do gráfico de caixa. Especificamente, os preços mínimos de {format_br(descriptive['Mínimo'])} dólares e máximos de {format_br(descriptive['Máximo'])} dólares são considerados outliers, indicando a presença de valores discrepantes no fechamento do Petróleo Brent para o período em estudo.
     
     Para compreender a influência dos elementos sazonais e da tendência da série de fechamento, foi realizado a decomposição, mostrada pelo Gráfico 3.
     
     **Gráfico 3 - Decomposição da série do Preço de Fechamento do Preço do Petróleo Brent**
     """)
-    # Indicação para imagem: Adicione a imagem do Gráfico 3 aqui
-    st.image("imagens/grafico_03_decomposicao_preco_petroleo.png", caption="Gráfico 3 - Decomposição da série do Preço de Fechamento do Preço do Petróleo Brent")
-
-    st.write("""
+    # Decomposição com período de 252 dias úteis, recalculada só quando os dados mudam
+    components = [('Série Observada', df_close['Close'], '#1f77b4'),
+                  ('Tendência', decomposition['trend'], '#ff7f0e'),
+                  ('Sazonalidade', decomposition['seasonal'], '#2ca02c'),
+                  ('Resíduo', decomposition['resid'], '#d62728')]
+    fig = make_subplots(rows=4, cols=1, shared_xaxes=True, subplot_titles=[title for title, _, _ in components])
+    for row, (title, values, color) in enumerate(components, start=1):
+        fig.add_trace(go.Scatter(x=df_close['Date'], y=values, mode='lines', name=title, line=dict(color=color)),
+                      row=row, col=1)
+    fig.update_layout(height=800, showlegend=False)
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.write(f"""
     A decomposição de uma série temporal, como a do preço de fechamento do Petróleo Brent, busca separar os componentes que a compõem: tendência, sazonalidade e resíduo. Cada componente fornece insights valiosos sobre o comportamento da série:
     
     - **Tendência:** Representa o movimento de longo prazo da série, indicando se há uma tendência de alta, baixa ou estabilidade. No caso do Petróleo Brent, a tendência, quando disponível, pode ajudar a identificar movimentos gerais de crescimento ou declínio no mercado ao longo do tempo.
@@ -199,15 +182,15 @@ elif menu == "Análise Exploratória dos Dados":
     - **H0:** há uma raiz unitária (ou seja, a série não é estacionária)
     - **H1:** não há uma raiz unitária (ou seja, a série é estacionária)
     
-    Ao aplicar o teste ADF aos dados de fechamento do petróleo Brent e considerando um nível de significância de 5%, o p-valor obtido foi de 0.4742. Este valor é maior do que o nível de significância escolhido, o que significa que não se rejeita a hipótese nula. Com um alto grau de confiança, conclui-se que a série apresenta uma raiz unitária e não é estacionária.
+    Ao aplicar o teste ADF aos dados de fechamento do petróleo Brent e considerando um nível de significância de 5%, o p-valor obtido foi de {tests['adf_pvalue']:.4f}. {adf_conclusion}
     
     **Tabela 2 - Teste de Inferência Estatística para o Preço de Fechamento do Petróleo Brent**
     """)
-    # Exemplo de tabela em Streamlit
+    # Tabela calculada a partir dos dados atuais
     data_adf = {
         "Teste": ["Dickey-Fuller (ADF)", "Shapiro-Wilk"],
-        "p-valor": [0.4742, "3.699e-11"],
-        "Estatística de teste": [-1.6170, 0.9853368866314274]
+        "p-valor": [round(tests['adf_pvalue'], 4), f"{tests['shapiro_pvalue']:.3e}"],
+        "Estatística de teste": [round(tests['adf_statistic'], 4), tests['shapiro_statistic']]
     }
     st.table(pd.DataFrame(data_adf))
 
@@ -310,6 +293,48 @@ elif menu == "Dashboard - Exploração e Insights":
     
     Com base nesses dados foi desenvolvido um painel de acompanhamento diário para monitoramento das flutuações de preços e busca por eventos que influenciam tais variações.
     """)
+
+    import plotly.graph_objects as go
+
+    from explorer import EVENTS, METHODS, PIXEL_WIDTH, events_in_range, explorer
+
+    st.subheader("Explorador do Histórico de Preços")
+    df_close = get_data()
+    first_date, last_date = df_close['Date'].min(), df_close['Date'].max()
+    available_events = events_in_range(first_date, last_date)
+
+    # Atalhos para os eventos do painel que estão dentro do período dos dados
+    focus = st.selectbox("Período:", ["Todo o histórico"] + [event.name for event in available_events])
+    if focus == "Todo o histórico":
+        default_range = (first_date.date(), last_date.date())
+    else:
+        event = next(event for event in available_events if event.name == focus)
+        # Margem de 90 dias antes e depois do evento, dentro do período disponível
+        default_range = (max(event.start - timedelta(days=90), first_date).date(),
+                         min(event.end + timedelta(days=90), last_date).date())
+    start_date, end_date = st.slider("Intervalo:", min_value=first_date.date(), max_value=last_date.date(),
+                                     value=default_range, format="DD/MM/YYYY", key=f"intervalo_{focus}")
+    method = st.radio("Redução dos pontos:", METHODS, horizontal=True,
+                      format_func={'lttb': 'LTTB', 'minmax': 'Mínimo e máximo'}.get)
+    start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+
+    # Série reduzida no servidor para a largura do gráfico (níveis de resolução em cache por versão dos dados)
+    with span('explorer_query'):
+        dates, prices, _ = explorer.query(df_close, data_resource.version, start_date, end_date,
+                                          width=PIXEL_WIDTH, method=method)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=prices, mode='lines', name='Preço de Fechamento', line=dict(color='darkblue')))
+    for event in events_in_range(start_date, end_date):
+        fig.add_vrect(x0=max(event.start, start_date), x1=min(event.end, end_date), fillcolor='orange', opacity=0.15,
+                      line_width=0, annotation_text=event.name, annotation_position='top left')
+    fig.update_layout(xaxis_title='', yaxis_title='Preço de Fechamento', legend=dict(x=0, y=1), hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+
+    missing_events = [event.name for event in EVENTS if event not in available_events]
+    if missing_events:
+        st.caption(f"Os dados disponíveis vão de {first_date:%d/%m/%Y} a {last_date:%d/%m/%Y}. "
+                   f"Eventos fora desse período: {', '.join(missing_events)}.")
     # Indicação para imagem: Adicione a imagem da Figura 3 aqui
     st.image("imagens/figura_03_dashboard_preco_petroleo_1986_2024.png", caption="Figura 3 - Painel da Variação do Preço do Petróleo de 1986 até 2024")
 
@@ -407,6 +432,24 @@ elif menu == "Previsão do Preço do Petróleo":
     Para obter a previsão do Preço de Fechamento do Petróleo Brent, por favor, selecione a data desejada. Para assegurar a máxima precisão das previsões, a escolha da data está limitada a um horizonte de até 15 dias a partir da data atual.
     """)
 
+    import plotly.graph_objects as go
+
+    from forecast_store import cached_predictions
+    from forecasting import forecast_bands
+    from registry import assets, get_asset_data, get_asset_model, get_asset_serving
+
+    # Ativo a ser previsto (cadastro em ativos.json; o padrão é o Petróleo Brent)
+    asset = st.selectbox("Selecione o ativo:", assets(), format_func=lambda a: f"{a.name} ({a.ticker})")
+
+    # Carregar os dados do CSV (recarregados só quando o arquivo muda) e o scaler e a janela
+    # usados no treino, gravados no pacote do modelo
+    df_close = get_asset_data(asset.ticker)
+    serving = get_asset_serving(asset.ticker)
+
+    # Calcular a data máxima permitida para previsão
+    last_date = df_close['Date'].max()
+    max_forecast_date = last_date + timedelta(days=MAX_FORECAST_DAYS)
+
     # Entrada de data do usuário com limite de data máxima
     input_date = st.date_input(
         "Selecione uma data para a previsão:",
@@ -415,48 +458,69 @@ elif menu == "Previsão do Preço do Petróleo":
         max_value=max_forecast_date
     )
 
-    # Botão para fazer a previsão
+    # Opção para exibir a faixa de incerteza (percentis 5% a 95%) da previsão
+    show_bands = st.checkbox("Exibir faixa de incerteza (Monte Carlo Dropout)")
+
+    # Botão para fazer a previsão (com PREVISAO_PROFILE definido, a execução é gravada pelo cProfile)
     if st.button("Prever"):
-        # Gerar previsões a partir dos últimos 'NUM_DAYS' de dados históricos até a data selecionada
-        predictions = generate_predictions(df_close, model, scaler, input_date, NUM_DAYS)
+        with profiled():
+            # Gerar previsões a partir da janela de dias históricos do treino até a data selecionada.
+            # O horizonte completo é pré-calculado por versão de modelo e dados; o modelo só é
+            # carregado quando o artefato está ausente ou desatualizado.
+            predictions = cached_predictions(df_close, serving.scaler, input_date, serving.window, MAX_FORECAST_DAYS,
+                                             engine=FORECAST_ENGINE, model_path=serving.model_path,
+                                             data_path=asset.data)
         
-        # Criar DataFrame para exibir as previsões
-        df_predictions = pd.DataFrame(predictions, columns=['Data', 'Preço'])
+            # Criar DataFrame para exibir as previsões
+            df_predictions = pd.DataFrame(predictions, columns=['Data', 'Preço'])
         
-        # Converter a coluna de data para datetime
-        df_predictions['Data'] = pd.to_datetime(df_predictions['Data'])
+            # Converter a coluna de data para datetime
+            df_predictions['Data'] = pd.to_datetime(df_predictions['Data'])
         
-        # Incluir o último ponto dos dados históricos nos dados preditos
-        last_historical_point = df_close.iloc[-1]
-        df_predictions = pd.concat([
-            pd.DataFrame({'Data': [last_historical_point['Date']], 'Preço': [last_historical_point['Close']]}),
-            df_predictions
-        ]).reset_index(drop=True)
+            # Incluir o último ponto dos dados históricos nos dados preditos
+            last_historical_point = df_close.iloc[-1]
+            df_predictions = pd.concat([
+                pd.DataFrame({'Data': [last_historical_point['Date']], 'Preço': [last_historical_point['Close']]}),
+                df_predictions
+            ]).reset_index(drop=True)
         
-        # Filtrar os últimos 'NUM_DAYS' de dados históricos
-        df_close_last_n = df_close.tail(NUM_DAYS)
+            # Filtrar os últimos 'NUM_DAYS' de dados históricos
+            df_close_last_n = df_close.tail(NUM_DAYS)
         
-        fig = go.Figure()
+            # Faixa de incerteza: todas as amostras avançam juntas em um único lote
+            if show_bands:
+                df_bands = forecast_bands(df_close, get_asset_model(asset.ticker), serving.scaler, input_date,
+                                          serving.window, samples=MC_SAMPLES)
         
-        # Dados históricos e preenchidos
-        fig.add_trace(go.Scatter(x=df_close_last_n['Date'], y=df_close_last_n['Close'],
-                                 mode='lines+markers', name='Dados Históricos', line=dict(color='blue')))
+            with span('plotly_figure'):
+                fig = go.Figure()
         
-        # Dados preditos
-        fig.add_trace(go.Scatter(x=df_predictions['Data'], y=df_predictions['Preço'],
-                                 mode='lines+markers', name='Previsão', line=dict(color='lightblue')))
+                if show_bands:
+                    fig.add_trace(go.Scatter(x=df_bands['Data'], y=df_bands['P95'], mode='lines',
+                                             line=dict(width=0), showlegend=False, hoverinfo='skip'))
+                    fig.add_trace(go.Scatter(x=df_bands['Data'], y=df_bands['P5'], mode='lines',
+                                             line=dict(width=0), fill='tonexty', fillcolor='rgba(173, 216, 230, 0.4)',
+                                             name='Faixa de Incerteza (P5–P95)'))
         
-        # Adicionar layout ao gráfico
-        fig.update_layout(title='Previsão do Preço de Fechamento do Petróleo Brent',
-                          xaxis_title='', yaxis_title='Preço do Petróleo',
-                          legend=dict(x=0, y=1), hovermode='x unified')
+                # Dados históricos e preenchidos
+                fig.add_trace(go.Scatter(x=df_close_last_n['Date'], y=df_close_last_n['Close'],
+                                         mode='lines+markers', name='Dados Históricos', line=dict(color='blue')))
         
-        # Renderizar o gráfico no Streamlit
-        st.plotly_chart(fig, use_container_width=True)
+                # Dados preditos
+                fig.add_trace(go.Scatter(x=df_predictions['Data'], y=df_predictions['Preço'],
+                                         mode='lines+markers', name='Previsão', line=dict(color='lightblue')))
         
-        # Exibir a tabela de previsões
-        st.subheader("Previsões de Preços por Data")
-        st.write(df_predictions)
+                # Adicionar layout ao gráfico
+                fig.update_layout(title=f'Previsão do Preço de Fechamento - {asset.name}',
+                                  xaxis_title='', yaxis_title='Preço',
+                                  legend=dict(x=0, y=1), hovermode='x unified')
+        
+            # Renderizar o gráfico no Streamlit
+            st.plotly_chart(fig, use_container_width=True)
+        
+            # Exibir a tabela de previsões
+            st.subheader("Previsões de Preços por Data")
+            st.write(df_predictions)
 
 elif menu == "Conclusão":
     st.title("Conclusão")
@@ -497,3 +561,8 @@ elif menu == "Referências":
     
     **PyPI.** Download market data from Yahoo! Finance’s API. Disponível em: https://pypi.org/project/yfinance/. Acesso em: 05 de novembro de 2024.
     """)
+
+# Métricas de desempenho por etapa (PREVISAO_METRICS=1)
+if metrics_enabled():
+    with st.sidebar.expander("Métricas de desempenho"):
+        st.json(snapshot())
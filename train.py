@@ -0,0 +1,210 @@
+import json
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset import create_dataset, make_tf_dataset
+
+# Arquivos gerados pelo treinamento
+MODEL_PATH = 'lstm_model.keras'
+METRICS_PATH = 'metricas_modelo.json'
+CHECKPOINT_DIR = 'checkpoints'
+
+# Configuração padrão, igual à do notebook (exceto batch_size, antes fixo em 1)
+DEFAULT_CONFIG = {
+    'time_step': 20,
+    'units': 50,
+    'dropout': 0.2,
+    'dense_units': 25,
+    'batch_size': 32,
+    'epochs': 100,
+    'patience': 10,
+    'train_fraction': 0.8,
+    'validation_fraction': 0.1,
+    'seed': 42,
+}
+
+
+# Definir a semente para reprodutibilidade
+def set_seed(seed=42):
+    import tensorflow as tf
+
+    np.random.seed(seed)
+    tf.random.set_seed(seed)
+    random.seed(seed)
+
+
+# Função para configurar o número de threads usadas pelo TensorFlow (0 = automático)
+def configure_threads(intra_op=0, inter_op=0):
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+
+# Função para criar o modelo LSTM com a mesma arquitetura do notebook
+def build_model(time_step, n_features=1, units=50, dropout=0.2, dense_units=25):
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+
+    model = Sequential()
+    model.add(Input(shape=(time_step, n_features)))
+    model.add(LSTM(units, return_sequences=True))
+    model.add(Dropout(dropout))
+    model.add(LSTM(units, return_sequences=False))
+    model.add(Dropout(dropout))
+    model.add(Dense(dense_units))
+    model.add(Dense(1))
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+# Função para carregar a série de fechamento e normalizá-la
+def load_series(csv_path):
+    from sklearn.preprocessing import MinMaxScaler
+
+    df_LSTM = pd.read_csv(csv_path, usecols=['Date', 'Close'], parse_dates=['Date'])
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_data = scaler.fit_transform(df_LSTM[['Close']])
+    return df_LSTM, scaler, scaled_data
+
+
+# Função para descrever o período de dados usado no treino
+def describe_data(df_LSTM, csv_path):
+    return {
+        'path': csv_path,
+        'start': str(df_LSTM['Date'].min().date()),
+        'end': str(df_LSTM['Date'].max().date()),
+        'rows': len(df_LSTM),
+    }
+
+
+# Função para calcular as métricas de erro usadas no notebook
+def compute_metrics(y_true, y_pred):
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, mean_squared_error, r2_score
+
+    return {
+        'MAE': float(mean_absolute_error(y_true, y_pred)),
+        'RMSE': float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        'MAPE': float(mean_absolute_percentage_error(y_true, y_pred)),
+        'R2': float(r2_score(y_true, y_pred)),
+    }
+
+
+# Função para avaliar o modelo em preços (normalização revertida)
+def evaluate(model, X, y, scaler, batch_size=256):
+    predictions = model.predict(X, batch_size=batch_size, verbose=0)
+    y_pred = scaler.inverse_transform(predictions.reshape(-1, 1))[:, 0]
+    y_true = scaler.inverse_transform(np.asarray(y).reshape(-1, 1))[:, 0]
+    return compute_metrics(y_true, y_pred)
+
+
+# Função para salvar o modelo sem deixar um arquivo parcial no lugar do atual
+def save_model(model, path):
+    tmp_path = f'{path}.tmp.keras'
+    model.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+# Função para dividir os dados em treino, validação (early stopping) e teste, como janelas
+def split_windows(scaled_data, time_step, train_fraction=0.8, validation_fraction=0.1):
+    # 80% para Treino e 20% para Teste
+    train_size = int(len(scaled_data) * train_fraction)
+    train_data = scaled_data[:train_size]
+    test_data = scaled_data[train_size:]
+
+    # A validação usa o final do período de treino, para não olhar os dados de teste
+    validation_size = int(len(train_data) * validation_fraction)
+    fit_data = train_data[:len(train_data) - validation_size]
+    validation_data = train_data[len(train_data) - validation_size - time_step - 1:]
+    return fit_data, validation_data, test_data
+
+
+# Função para treinar o modelo completo a partir do CSV
+def train(csv_path, config=None, checkpoint_dir=CHECKPOINT_DIR, verbose=1, callbacks=None):
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    set_seed(config['seed'])
+
+    df_LSTM, scaler, scaled_data = load_series(csv_path)
+    time_step = config['time_step']
+    fit_data, validation_data, test_data = split_windows(
+        scaled_data, time_step, config['train_fraction'], config['validation_fraction'])
+
+    train_ds = make_tf_dataset(fit_data, time_step, config['batch_size'], shuffle=True, seed=config['seed'])
+    validation_ds = make_tf_dataset(validation_data, time_step, config['batch_size'])
+
+    model = build_model(time_step, scaled_data.shape[1], config['units'], config['dropout'], config['dense_units'])
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    callbacks = [
+        EarlyStopping(monitor='val_loss', patience=config['patience'], restore_best_weights=True),
+        ModelCheckpoint(os.path.join(checkpoint_dir, 'lstm_best.keras'), monitor='val_loss', save_best_only=True),
+        *(callbacks or []),
+    ]
+
+    start = time.perf_counter()
+    history = model.fit(train_ds, validation_data=validation_ds, epochs=config['epochs'],
+                        callbacks=callbacks, verbose=verbose)
+    training_seconds = time.perf_counter() - start
+
+    X_test, y_test = create_dataset(test_data, time_step)
+    metrics = {
+        'config': config,
+        'data': describe_data(df_LSTM, csv_path),
+        'epochs_run': len(history.history['loss']),
+        'best_val_loss': float(min(history.history['val_loss'])),
+        'val_loss_history': [float(value) for value in history.history['val_loss']],
+        'training_seconds': training_seconds,
+        'test': evaluate(model, X_test, y_test, scaler),
+    }
+    return model, metrics
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from bundle import BUNDLE_PATH, save_bundle
+
+    parser = argparse.ArgumentParser(description='Retreina o modelo LSTM de previsão do Petróleo Brent.')
+    parser.add_argument('--data', default='dados_petroleo.csv', help='CSV com as colunas Date e Close')
+    parser.add_argument('--output', default=MODEL_PATH, help='arquivo .keras de saída')
+    parser.add_argument('--bundle', default=BUNDLE_PATH, help='pacote do modelo (rede, scaler e janela) usado na aplicação')
+    parser.add_argument('--metrics', default=METRICS_PATH, help='arquivo JSON com as métricas')
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR)
+    parser.add_argument('--time-step', type=int, default=DEFAULT_CONFIG['time_step'])
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_CONFIG['batch_size'])
+    parser.add_argument('--epochs', type=int, default=DEFAULT_CONFIG['epochs'])
+    parser.add_argument('--patience', type=int, default=DEFAULT_CONFIG['patience'])
+    parser.add_argument('--seed', type=int, default=DEFAULT_CONFIG['seed'])
+    parser.add_argument('--intra-op-threads', type=int, default=0, help='threads por operação (0 = automático)')
+    parser.add_argument('--inter-op-threads', type=int, default=0, help='operações em paralelo (0 = automático)')
+    parser.add_argument('--no-export', action='store_true', help='não exportar os pesos para o backend NumPy')
+    args = parser.parse_args()
+
+    configure_threads(args.intra_op_threads, args.inter_op_threads)
+    model, metrics = train(args.data, {
+        'time_step': args.time_step,
+        'batch_size': args.batch_size,
+        'epochs': args.epochs,
+        'patience': args.patience,
+        'seed': args.seed,
+    }, checkpoint_dir=args.checkpoint_dir, verbose=2)
+
+    save_model(model, args.output)
+    # O scaler é reajustado sobre o mesmo CSV, de forma idêntica ao do treino
+    _, scaler, _ = load_series(args.data)
+    save_bundle(model, scaler, args.bundle, training_data=metrics['data'],
+                extra={'config': metrics['config'], 'test': metrics['test']})
+    if not args.no_export:
+        from numpy_lstm import export_weights, weights_path_for
+
+        export_weights(args.output, weights_path_for(args.output))
+
+    with open(args.metrics, 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2, ensure_ascii=False)
+    print(json.dumps(metrics['test'], indent=2))